@@ -1,25 +1,80 @@
+import os
 import jwt
 import bcrypt
+import time
+import hmac
+import base64
+import hashlib
+import logging
+import orjson
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Union, Dict, Tuple
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from bson import ObjectId
 from app.config import settings
 from app.database import get_collection
 from app.models.user import TokenData, UserRole
 
+logger = logging.getLogger(__name__)
+
 # Security
 security = HTTPBearer()
 
 # JWT Settings
 SECRET_KEY = settings.jwt_secret
 ALGORITHM = "HS256"
+_DECODE_ALGORITHMS = (ALGORITHM,)
+# Keyed HMAC state computed once; copying it skips re-deriving the ipad/opad blocks per token
+_HMAC_TEMPLATE = hmac.new(SECRET_KEY.encode('utf-8'), digestmod=hashlib.sha256)
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Password hashing cost; existing hashes are upgraded on next login when this changes
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so one thread per core runs hashes in parallel; a dedicated
+# pool keeps bursts of logins from filling the threadpool shared with sync endpoints
+_PASSWORD_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwhash")
+
+# Verification caches
+TOKEN_CACHE_MAX_SIZE = 1024
+USER_CACHE_TTL_SECONDS = 60
+
+# token -> (exp timestamp, TokenData); only successful verifications are stored
+_token_cache: Dict[str, Tuple[float, TokenData]] = {}
+# user_id -> (cache version, cached_at monotonic) for users confirmed active
+_active_user_cache: Dict[str, Tuple[int, float]] = {}
+_user_cache_version = 0
+
+# Fields the login flow reads from the user document
+LOGIN_USER_PROJECTION = {
+    "_id": 1, "email": 1, "name": 1, "role": 1, "is_active": 1, "avatar": 1,
+    "password_hash": 1, "telegram_id": 1, "telegram_preferences": 1
+}
+
+_users_collection = None
+
+def get_users_collection():
+    """Resolve the users collection once and reuse the handle"""
+    global _users_collection
+    if _users_collection is None:
+        _users_collection = get_collection("users")
+    return _users_collection
+
+def _evict_oldest(cache: dict):
+    """Drop the oldest entry once a cache reaches its size limit"""
+    if len(cache) >= TOKEN_CACHE_MAX_SIZE:
+        cache.pop(next(iter(cache)), None)
+
+def invalidate_user_cache():
+    """Forget cached active-user lookups (call after deactivating/deleting users)"""
+    global _user_cache_version
+    _user_cache_version += 1
+    _active_user_cache.clear()
+
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -27,6 +82,24 @@ def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash was created with a different cost factor"""
+    try:
+        # bcrypt hashes look like $2b$12$<salt+hash>
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread so bcrypt doesn't block the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_PASSWORD_HASH_POOL, hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so bcrypt doesn't block the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _PASSWORD_HASH_POOL, verify_password, password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,31 +112,83 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _b64url_decode(segment: str) -> bytes:
+    """Decode a base64url JWT segment, restoring the stripped padding"""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def _decode_hs256(token: str) -> dict:
+    """Verify an HS256 token and return its claims
+
+    Fast path for tokens issued by create_access_token; raises the same
+    PyJWT exceptions as jwt.decode so callers handle both alike.
+    """
+    if token.count(".") != 2:
+        raise jwt.DecodeError("Not enough segments")
+
+    signing_input, _, signature_segment = token.rpartition(".")
+    header_segment, _, payload_segment = signing_input.partition(".")
+    try:
+        header = orjson.loads(_b64url_decode(header_segment))
+        payload = orjson.loads(_b64url_decode(payload_segment))
+        signature = _b64url_decode(signature_segment)
+    except ValueError as e:
+        raise jwt.DecodeError(f"Invalid token: {e}")
+
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid token: header and payload must be JSON objects")
+    if header.get("alg") not in _DECODE_ALGORITHMS:
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+
+    mac = _HMAC_TEMPLATE.copy()
+    mac.update(signing_input.encode('ascii'))
+    expected = mac.digest()
+    if not hmac.compare_digest(expected, signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+
+    exp = payload.get("exp")
+    if exp is None:
+        raise jwt.MissingRequiredClaimError("exp")
+    if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+        raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.")
+    if exp <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+
+    return payload
+
 def verify_token(token: str) -> TokenData:
     """Verify and decode JWT token"""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        exp, token_data = cached
+        if exp > time.time():
+            return token_data
+        _token_cache.pop(token, None)
+
     try:
-        print(f"Verifying token: {token[:50]}...")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"Token payload: {payload}")
+        payload = _decode_hs256(token)
         email: str = payload.get("sub")
         if email is None:
-            print("Error: No email in token payload")
+            logger.debug("No email in token payload")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
         
-        token_data = TokenData(
+        # The payload is trusted once the signature checks out, so skip validation
+        token_data = TokenData.model_construct(
             email=email,
             user_id=payload.get("user_id"),
             name=payload.get("name"),
             role=UserRole(payload.get("role")),
             is_active=payload.get("is_active", True)
         )
-        print(f"Token verification successful for user: {token_data.name}")
+        logger.debug("Token verification successful for user: %s", token_data.name)
+
+        _evict_oldest(_token_cache)
+        _token_cache[token] = (payload["exp"], token_data)
         return token_data
     except jwt.PyJWTError as e:
-        print(f"JWT Error: {e}")
+        logger.debug("JWT Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
@@ -73,16 +198,28 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """Get current authenticated user"""
     token = credentials.credentials
     token_data = verify_token(token)
-    
+
+    # Skip the database check if this user was confirmed active recently
+    cached = _active_user_cache.get(token_data.user_id)
+    if (cached is not None and cached[0] == _user_cache_version
+            and time.monotonic() - cached[1] < USER_CACHE_TTL_SECONDS):
+        return token_data
+
     # Verify user still exists and is active
-    users_collection = get_collection("users")
-    user = await users_collection.find_one({"_id": ObjectId(token_data.user_id), "is_active": True})
+    version = _user_cache_version
+    users_collection = get_users_collection()
+    user = await users_collection.find_one(
+        {"_id": token_data.user_oid, "is_active": True},
+        {"_id": 1}
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
-    
+
+    _evict_oldest(_active_user_cache)
+    _active_user_cache[token_data.user_id] = (version, time.monotonic())
     return token_data
 
 async def get_current_active_user(current_user: TokenData = Depends(get_current_user)) -> TokenData:
@@ -105,19 +242,27 @@ async def get_current_admin_user(current_user: TokenData = Depends(get_current_a
 
 async def authenticate_user(name: str, password: str) -> Optional[dict]:
     """Authenticate user credentials"""
-    users_collection = get_collection("users")
+    users_collection = get_users_collection()
     # Trim whitespace from name to handle mobile input issues
     clean_name = name.strip()
-    user = await users_collection.find_one({"name": clean_name})
+    user = await users_collection.find_one({"name": clean_name}, LOGIN_USER_PROJECTION)
     
     if not user:
         return None
     
-    if not verify_password(password, user["password_hash"]):
+    if not await verify_password_async(password, user["password_hash"]):
         return None
     
     if not user.get("is_active", True):
         return None
+
+    # Transparently upgrade hashes created with an older cost factor
+    if password_needs_rehash(user["password_hash"]):
+        user["password_hash"] = await hash_password_async(password)
+        await users_collection.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": user["password_hash"]}}
+        )
     
     return user
 
@@ -1,5 +1,5 @@
 import os
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     mongodb_url: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
@@ -10,7 +10,7 @@ class Settings(BaseSettings):
     cors_origins: str = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,https://yskandar.com")
     jwt_secret: str = os.getenv("JWT_SECRET", "your-super-secret-key-change-in-production")
 
-    class Config:
-        env_file = ".env"
+    # Settings are read once at startup and never change afterwards
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
 
 settings = Settings()
\ No newline at end of file
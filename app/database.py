@@ -1,9 +1,18 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 client: AsyncIOMotorClient = None
 database = None
 
+# Case-insensitive string comparison; queries must pass it to use the username index below
+USERNAME_COLLATION = {"locale": "en", "strength": 2}
+
+# Covering index for the activity stats aggregation (hinted there)
+ACTIVITY_STATS_INDEX = [("timestamp", -1), ("event_type", 1), ("success", 1)]
+
 async def get_database():
     return database
 
@@ -12,6 +21,50 @@ async def connect_to_mongo():
     client = AsyncIOMotorClient(settings.mongodb_url)
     database = client[settings.database_name]
     print(f"Connected to MongoDB database: {settings.database_name}")
+    await ensure_indexes()
+
+async def ensure_indexes():
+    """Create the indexes used by hot queries (no-op if they already exist)"""
+    try:
+        # Covers the per-request active-user check in get_current_user
+        await database["users"].create_index([("_id", 1), ("is_active", 1)])
+        # Covers the admin Telegram recipients query; partial so only admins with Telegram are indexed
+        await database["users"].create_index(
+            [
+                ("role", 1),
+                ("is_active", 1),
+                ("telegram_preferences.enabled", 1),
+                ("telegram_preferences.admin_notifications", 1)
+            ],
+            partialFilterExpression={"role": "admin", "telegram_id": {"$exists": True}},
+            name="admin_tg_recipients"
+        )
+        # Range scans for online users (last_seen within ONLINE_THRESHOLD_MINUTES)
+        await database["users"].create_index("last_seen")
+        # Activity logs are always read newest first. The timestamp prefix serves the unfiltered
+        # list and cleanup; event_type/success let the stats aggregation run from the index alone
+        activity_logs = database["user_activity_logs"]
+        await activity_logs.create_index(ACTIVITY_STATS_INDEX)
+        await activity_logs.create_index(
+            [("username", 1), ("timestamp", -1)],
+            collation=USERNAME_COLLATION,
+            name="username_ci_timestamp"
+        )
+        await activity_logs.create_index([("event_type", 1), ("timestamp", -1)])
+    except Exception as e:
+        logger.error("Error creating MongoDB indexes: %s", e)
+    # Emails and names identify users at login; create_user and update_user rely on these
+    # to reject duplicates, so the app must not start without them
+    missing = []
+    for field in ("email", "name"):
+        try:
+            await database["users"].create_index(field, unique=True)
+        except Exception as e:
+            # Fails if existing users already share the value
+            logger.error("Error creating unique users.%s index: %s", field, e)
+            missing.append(field)
+    if missing:
+        raise RuntimeError(f"Unique users index missing on {', '.join(missing)}; resolve duplicates and restart")
 
 async def close_mongo_connection():
     global client
@@ -4,28 +4,42 @@ from app.database import connect_to_mongo, close_mongo_connection
 from app.routers import posts, comments, chat, files, auth, categories, notifications, news, activity_logs, backup, dropbox_oauth, telegram, video_calls, calendar
 from app.services.scheduler_service import scheduler_service
 from app.services.telegram_service import telegram_service
+from app.services.activity_logger import start_activity_log_writer, stop_activity_log_writer
+from app.utils.presence import start_last_seen_flusher, stop_last_seen_flusher
+from app.utils.telegram_admins import get_admin_telegram_ids, start_admin_watch, stop_admin_watch
+from app.utils.responses import ORJSONResponse
+from app.utils import socketio_json
 from app.database import get_collection
 import socketio
 import os
-from datetime import datetime, timedelta
+import time
+import asyncio
+import logging
+from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
+
 # Get CORS origins from environment variable or use defaults
 cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,https://yskandar.com")
 cors_origins = [origin.strip() for origin in cors_origins_str.split(",")]
 
 sio = socketio.AsyncServer(
     async_mode='asgi',
-    cors_allowed_origins=cors_origins
+    cors_allowed_origins=cors_origins,
+    json=socketio_json
 )
 
 app = FastAPI(
     title="Iskandar Community API",
     description="Private community web application API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -36,14 +50,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# video_calls collection handle used by the socket handlers, bound once connected
+video_calls_collection = None
+
 @app.on_event("startup")
 async def startup_db_client():
+    global video_calls_collection, chat_notification_queue, chat_notification_task
     await connect_to_mongo()
+    video_calls_collection = get_collection("video_calls")
     # Start the backup scheduler
     await scheduler_service.start()
+    # Keep the admin Telegram recipients in sync with user changes
+    start_admin_watch()
+    # Write activity logs in batches off the request path
+    start_activity_log_writer()
+    # Write heartbeat last_seen updates in periodic bulk batches
+    start_last_seen_flusher()
+    # Send chat activity notifications off the socket handlers
+    chat_notification_queue = asyncio.Queue()
+    chat_notification_task = asyncio.create_task(chat_notification_worker())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if chat_notification_task:
+        chat_notification_task.cancel()
+        try:
+            await chat_notification_task
+        except asyncio.CancelledError:
+            pass
+    await stop_admin_watch()
+    # Flush queued activity logs while the database connection is still open
+    await stop_activity_log_writer()
+    # Write the last window of heartbeat updates
+    await stop_last_seen_flusher()
     # Stop the backup scheduler
     await scheduler_service.stop()
     await close_mongo_connection()
@@ -73,88 +112,189 @@ app.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
 
 socket_app = socketio.ASGIApp(sio, app)
 
+# Socket.IO room used for chat broadcasts
+CHAT_ROOM = "chat"
+
+# Socket.IO room for sockets that follow online presence (receive users_online_diff events)
+ONLINE_USERS_ROOM = "online_users"
+
 # Store online users
 online_users = {}
 
-# Store active video call participants: sid -> (call_id, user_id, username)
-active_video_calls = {}
+# Reverse index socket_id -> user_id so disconnects don't scan online_users
+sid_to_user_id = {}
+
+# users_online_update snapshot payload, rebuilt only when online_users changes
+online_users_list = []
+
+# Store active video call participants per call: call_id -> {user_id: (sid, username)}
+calls_by_id = {}
+
+# Reverse index sid -> (call_id, user_id) for leave and disconnect
+sid_to_location = {}
+
+# Chat notifications waiting for chat_notification_worker, created at startup
+chat_notification_queue = None
+chat_notification_task = None
+CHAT_NOTIFICATION_BATCH_DELAY_SECONDS = 0.5
 
-# Track last chat activity for admin notifications
+# Track last chat activity for admin notifications (time.monotonic() seconds)
 last_chat_notification = None
+CHAT_NOTIFICATION_INTERVAL_SECONDS = 2 * 60 * 60
+
+def track_video_call_participant(sid, call_id, user_id, username):
+    """Record a socket as a participant of a WebRTC call"""
+    untrack_video_call_participant(sid)
+    calls_by_id.setdefault(call_id, {})[user_id] = (sid, username)
+    sid_to_location[sid] = (call_id, user_id)
+
+def untrack_video_call_participant(sid):
+    """Stop tracking a socket's WebRTC call; returns its (call_id, user_id, username) or None"""
+    location = sid_to_location.pop(sid, None)
+    if not location:
+        return None
+
+    call_id, user_id = location
+    participants = calls_by_id.get(call_id, {})
+    participant = participants.get(user_id)
+    username = participant[1] if participant else None
+    # Only drop the participant if a newer socket of the same user hasn't replaced it
+    if participant and participant[0] == sid:
+        del participants[user_id]
+        if not participants:
+            del calls_by_id[call_id]
+    return call_id, user_id, username
+
+def get_video_call_participant_sid(call_id, user_id):
+    """Socket ID of a user in a WebRTC call, or None"""
+    participant = calls_by_id.get(call_id, {}).get(user_id)
+    return participant[0] if participant else None
+
+async def remove_video_call_participant(call_id, user_id):
+    """
+    Remove a participant from a call in a single write.
+    The call is reset to waiting when nobody is left (meeting rooms are reused, not ended).
+    Returns True if the call was reset.
+    """
+    collection = video_calls_collection
+    no_participants = {"$eq": [{"$size": "$participants"}, 0]}
+    call = await collection.find_one_and_update(
+        {"_id": ObjectId(call_id)},
+        [
+            {"$set": {"participants": {"$filter": {
+                "input": {"$ifNull": ["$participants", []]},
+                "as": "p",
+                "cond": {"$ne": ["$$p.user_id", ObjectId(user_id)]}
+            }}}},
+            {"$set": {
+                "status": {"$cond": [no_participants, "waiting", "$status"]},
+                "started_at": {"$cond": [no_participants, None, "$started_at"]}
+            }}
+        ],
+        projection={"_id": 0, "participants.user_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return bool(call) and not call.get("participants")
+
+def refresh_online_users_list():
+    """Rebuild the cached online users broadcast list after a membership change"""
+    global online_users_list
+    # socket_id is internal routing state and is not shipped to clients
+    online_users_list = [
+        {'id': user['id'], 'name': user['name'], 'role': user['role']}
+        for user in online_users.values()
+    ]
 
 @sio.event
 async def connect(sid, environ):
-    print(f"Client {sid} connected")
+    logger.debug("Client %s connected", sid)
+    # Chat messages are fanned out to this room rather than the whole namespace
+    await sio.enter_room(sid, CHAT_ROOM)
 
 @sio.event
 async def disconnect(sid):
-    print(f"Client {sid} disconnected")
+    logger.debug("Client %s disconnected", sid)
 
     # Remove user from online users if they were tracked
-    user_to_remove = None
-    for user_id, user_data in online_users.items():
-        if user_data.get('socket_id') == sid:
-            user_to_remove = user_id
-            break
+    user_to_remove = sid_to_user_id.pop(sid, None)
 
-    if user_to_remove:
+    if user_to_remove and online_users.get(user_to_remove, {}).get('socket_id') == sid:
         del online_users[user_to_remove]
-        # Broadcast updated user list
-        await sio.emit('users_online_update', list(online_users.values()))
+        refresh_online_users_list()
+        # Broadcast the change to presence subscribers
+        await sio.emit('users_online_diff', {
+            'type': 'leave',
+            'user': {'id': user_to_remove}
+        }, room=ONLINE_USERS_ROOM)
 
     # Handle video call cleanup for sudden disconnections
-    if sid in active_video_calls:
-        call_id, user_id, username = active_video_calls[sid]
-        print(f"Cleaning up video call for disconnected user {username} in call {call_id}")
+    video_call = untrack_video_call_participant(sid)
+    if video_call:
+        call_id, user_id, username = video_call
+        logger.debug("Cleaning up video call for disconnected user %s in call %s", username, call_id)
+
+        # Update database and notify others in the room about the disconnection concurrently
+        await asyncio.gather(
+            cleanup_video_call_participant(call_id, user_id, username),
+            sio.emit('webrtc_user_left', {
+                'userId': user_id
+            }, room=f"webrtc_call_{call_id}")
+        )
 
-        # Remove from tracking
-        del active_video_calls[sid]
+async def add_video_call_participant(call_id, user_id, username):
+    """Add a participant to the call in the database, replacing any previous entry for the user"""
+    try:
+        now = datetime.utcnow()
+        participant_id = ObjectId(user_id)
+        participant = {
+            "user_id": participant_id,
+            "username": username,
+            "joined_at": now
+        }
 
-        # Update database: remove participant
-        try:
-            from app.database import get_collection
-            from bson import ObjectId
+        # Replace any existing entry for this user and mark the call active in one write
+        await video_calls_collection.update_one(
+            {"_id": ObjectId(call_id)},
+            [{
+                "$set": {
+                    "participants": {"$concatArrays": [
+                        {"$filter": {
+                            "input": {"$ifNull": ["$participants", []]},
+                            "as": "p",
+                            "cond": {"$ne": ["$$p.user_id", participant_id]}
+                        }},
+                        {"$literal": [participant]}
+                    ]},
+                    "status": "active",
+                    "started_at": now
+                }
+            }]
+        )
+        logger.debug("Updated DB: Added participant %s to call %s", username, call_id)
+
+    except Exception as e:
+        logger.error("Error updating DB for join: %s", e)
 
-            collection = get_collection("video_calls")
+async def cleanup_video_call_participant(call_id, user_id, username):
+    """Remove a participant who left or disconnected from the call in the database"""
+    try:
+        was_reset = await remove_video_call_participant(call_id, user_id)
+        logger.debug("Updated DB: Removed participant %s from call %s", username or user_id, call_id)
+        if was_reset:
+            logger.debug("Call %s reset to waiting (no participants left)", call_id)
 
-            # Remove participant
-            await collection.update_one(
-                {"_id": ObjectId(call_id)},
-                {"$pull": {"participants": {"user_id": ObjectId(user_id)}}}
-            )
-            print(f"Cleaned up DB: Removed participant {username} from call {call_id}")
-
-            # Check if call should be reset (no participants left)
-            call = await collection.find_one({"_id": ObjectId(call_id)})
-            if call and len(call.get("participants", [])) == 0:
-                await collection.update_one(
-                    {"_id": ObjectId(call_id)},
-                    {
-                        "$set": {
-                            "status": "waiting",
-                            "started_at": None
-                        }
-                    }
-                )
-                print(f"Call {call_id} reset to waiting (no participants after disconnect)")
-
-        except Exception as e:
-            print(f"Error cleaning up video call on disconnect: {e}")
-
-        # Notify others in the room about the disconnection
-        await sio.emit('webrtc_user_left', {
-            'userId': user_id
-        }, room=f"webrtc_call_{call_id}")
+    except Exception as e:
+        logger.error("Error updating DB for leave: %s", e)
 
 @sio.event
 async def send_message(sid, data):
-    global last_chat_notification
-
     # Emit the message to other users
-    await sio.emit('receive_message', data, skip_sid=sid)
+    await sio.emit('receive_message', data, room=CHAT_ROOM, skip_sid=sid)
 
-    # Check if we should send Telegram notification to admins
-    await check_and_send_chat_notification(data)
+    # Notify admins via Telegram only when outside the cooldown window, without delaying the handler
+    reason = check_chat_notification_due()
+    if reason and chat_notification_queue is not None:
+        chat_notification_queue.put_nowait((data, reason))
 
 @sio.event
 async def user_online(sid, data):
@@ -164,27 +304,52 @@ async def user_online(sid, data):
     user_role = data.get('role')
     
     if user_id and user_name:
+        # Drop the mapping for a previous socket of the same user
+        previous = online_users.get(user_id)
+        if previous and previous['socket_id'] != sid:
+            sid_to_user_id.pop(previous['socket_id'], None)
+
         online_users[user_id] = {
             'id': user_id,
             'name': user_name,
             'role': user_role,
             'socket_id': sid
         }
-        
-        # Broadcast updated user list to all clients
-        await sio.emit('users_online_update', list(online_users.values()))
-        print(f"User {user_name} is now online")
+        sid_to_user_id[sid] = user_id
+        refresh_online_users_list()
+
+        # Broadcast the change to presence subscribers and send the full list to the new socket
+        await sio.enter_room(sid, ONLINE_USERS_ROOM)
+        await asyncio.gather(
+            sio.emit('users_online_diff', {
+                'type': 'join',
+                'user': {'id': user_id, 'name': user_name, 'role': user_role}
+            }, room=ONLINE_USERS_ROOM, skip_sid=sid),
+            sio.emit('users_online_update', online_users_list, room=sid)
+        )
+        logger.debug("User %s is now online", user_name)
 
 @sio.event
 async def user_offline(sid, user_id):
     """Handle user going offline"""
     if user_id in online_users:
-        user_name = online_users[user_id]['name']
-        del online_users[user_id]
+        user_data = online_users.pop(user_id)
+        user_name = user_data['name']
+        sid_to_user_id.pop(user_data['socket_id'], None)
+        refresh_online_users_list()
+
+        # Broadcast the change to presence subscribers
+        await sio.emit('users_online_diff', {
+            'type': 'leave',
+            'user': {'id': user_id}
+        }, room=ONLINE_USERS_ROOM)
+        logger.debug("User %s went offline", user_name)
 
-        # Broadcast updated user list to all clients
-        await sio.emit('users_online_update', list(online_users.values()))
-        print(f"User {user_name} went offline")
+@sio.event
+async def request_online_snapshot(sid, data=None):
+    """Send the full online users list to the requesting socket only"""
+    await sio.enter_room(sid, ONLINE_USERS_ROOM)
+    await sio.emit('users_online_update', online_users_list, room=sid)
 
 @sio.event
 async def send_video_call_invitation(sid, data):
@@ -209,18 +374,18 @@ async def send_video_call_invitation(sid, data):
             'channel_name': channel_name,
             'call_type': call_type
         }
-        print(f"Sending video call invitation: {invitation_data}")
+        logger.debug("Sending video call invitation: %s", invitation_data)
         await sio.emit('video_call_invitation', invitation_data, room=target_socket_id)
-        print(f"Sent video call invitation from {caller_id} to {callee_id}")
+        logger.debug("Sent video call invitation from %s to %s", caller_id, callee_id)
 
 @sio.event
 async def video_call_response(sid, data):
     """Handle video call response (accept/decline)"""
-    print(f"Received video_call_response: {data}")
+    logger.debug("Received video_call_response: %s", data)
     caller_id = data.get('caller_id')
     response = data.get('response')  # 'accepted' or 'declined'
     call_id = data.get('call_id')
-    print(f"Extracted call_id: {call_id} (type: {type(call_id)})")
+    logger.debug("Extracted call_id: %s (type: %s)", call_id, type(call_id))
 
     # Find the caller's socket ID
     target_socket_id = None
@@ -234,7 +399,7 @@ async def video_call_response(sid, data):
             'response': response,
             'responder_name': data.get('responder_name')
         }, room=target_socket_id)
-        print(f"Video call {response} for call {call_id}")
+        logger.debug("Video call %s for call %s", response, call_id)
 
 @sio.event
 async def join_video_call_room(sid, data):
@@ -280,247 +445,81 @@ async def video_call_signal(sid, data):
     }, room=f"video_call_{call_id}", skip_sid=sid)
 
 # WebRTC signaling events
-@sio.event
-async def join_webrtc_room(sid, data):
-    """Handle user joining WebRTC room (new multi-participant format)"""
+async def handle_webrtc_join(sid, data, send_existing_users):
+    """Handle user joining a WebRTC call, shared by the room and call join events"""
     call_id = data.get('callId')
     user_id = data.get('userId')
     username = data.get('username')
 
-    print(f"User {username} joining WebRTC room {call_id}")
+    logger.debug("User %s joining WebRTC call %s", username, call_id)
 
     # Track this connection
-    active_video_calls[sid] = (call_id, user_id, username)
+    track_video_call_participant(sid, call_id, user_id, username)
 
     # Join the socket room for this call
     await sio.enter_room(sid, f"webrtc_call_{call_id}")
 
-    # Update database: add participant to the call
-    try:
-        from app.database import get_collection
-        from bson import ObjectId
-        from datetime import datetime
-
-        collection = get_collection("video_calls")
-
-        # Add participant if not already in the call
-        participant = {
-            "user_id": ObjectId(user_id),
-            "username": username,
-            "joined_at": datetime.utcnow()
-        }
-
-        # Remove any existing participant with same user_id to avoid duplicates
-        await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {"$pull": {"participants": {"user_id": ObjectId(user_id)}}}
-        )
-
-        # Add the participant
-        await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {
-                "$addToSet": {"participants": participant},
-                "$set": {
-                    "status": "active",
-                    "started_at": datetime.utcnow()
-                }
-            }
-        )
-        print(f"Updated DB: Added participant {username} to call {call_id}")
-
-    except Exception as e:
-        print(f"Error updating DB for join: {e}")
-
-    # Get list of users already in the room (before notifying about new user)
     existing_users = []
-    for socket_id, (stored_call_id, stored_user_id, stored_username) in active_video_calls.items():
-        if stored_call_id == call_id and socket_id != sid:  # Don't include the new user
-            existing_users.append({
-                'userId': stored_user_id,
-                'username': stored_username
-            })
-
-    print(f"Existing users in room {call_id}: {existing_users}")
-
-    # Send existing users list to the new user
-    if existing_users:
-        for existing_user in existing_users:
-            await sio.emit('webrtc_user_joined', existing_user, room=sid)
-            print(f"Sent existing user {existing_user['username']} to new user {username}")
-
-    # Notify others in the room about the new user
-    await sio.emit('webrtc_user_joined', {
-        'userId': user_id,
-        'username': username
-    }, room=f"webrtc_call_{call_id}", skip_sid=sid)
+    if send_existing_users:
+        # Get list of users already in the room (before notifying about new user)
+        for stored_user_id, (socket_id, stored_username) in calls_by_id.get(call_id, {}).items():
+            if socket_id != sid:  # Don't include the new user
+                existing_users.append({
+                    'userId': stored_user_id,
+                    'username': stored_username
+                })
+
+        logger.debug("Existing users in room %s: %s", call_id, existing_users)
+
+    # Update database, send existing users to the new user and notify others in the room concurrently
+    await asyncio.gather(
+        add_video_call_participant(call_id, user_id, username),
+        *[sio.emit('webrtc_user_joined', existing_user, room=sid) for existing_user in existing_users],
+        sio.emit('webrtc_user_joined', {
+            'userId': user_id,
+            'username': username
+        }, room=f"webrtc_call_{call_id}", skip_sid=sid)
+    )
+
+    logger.debug("Notified room about new user %s", username)
 
-    print(f"Notified room about new user {username}")
+@sio.event
+async def join_webrtc_room(sid, data):
+    """Handle user joining WebRTC room (new multi-participant format)"""
+    await handle_webrtc_join(sid, data, send_existing_users=True)
 
 @sio.event
 async def join_webrtc_call(sid, data):
     """Handle user joining WebRTC call"""
-    call_id = data.get('callId')
-    user_id = data.get('userId')
-    username = data.get('username')
-
-    print(f"User {username} joining WebRTC call {call_id}")
+    await handle_webrtc_join(sid, data, send_existing_users=False)
 
-    # Track this connection
-    active_video_calls[sid] = (call_id, user_id, username)
-
-    # Join the socket room for this call
-    await sio.enter_room(sid, f"webrtc_call_{call_id}")
-
-    # Update database: add participant to the call
-    try:
-        from app.database import get_collection
-        from bson import ObjectId
-        from datetime import datetime
-
-        collection = get_collection("video_calls")
-
-        # Add participant if not already in the call
-        participant = {
-            "user_id": ObjectId(user_id),
-            "username": username,
-            "joined_at": datetime.utcnow()
-        }
-
-        # Remove any existing participant with same user_id to avoid duplicates
-        await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {"$pull": {"participants": {"user_id": ObjectId(user_id)}}}
-        )
-
-        # Add the participant
-        await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {
-                "$addToSet": {"participants": participant},
-                "$set": {
-                    "status": "active",
-                    "started_at": datetime.utcnow()
-                }
-            }
-        )
-        print(f"Updated DB: Added participant {username} to call {call_id}")
-
-    except Exception as e:
-        print(f"Error updating DB for join: {e}")
-
-    # Notify others in the room
-    await sio.emit('webrtc_user_joined', {
-        'userId': user_id,
-        'username': username
-    }, room=f"webrtc_call_{call_id}", skip_sid=sid)
-
-@sio.event
-async def leave_webrtc_room(sid, data):
-    """Handle user leaving WebRTC room (new multi-participant format)"""
+async def handle_webrtc_leave(sid, data):
+    """Handle user leaving WebRTC room or call"""
     call_id = data.get('callId')
     user_id = data.get('userId')
 
-    print(f"User {user_id} leaving WebRTC room {call_id}")
+    logger.debug("User %s leaving WebRTC call %s", user_id, call_id)
 
     # Get username before removing from tracking
     username = None
-    if sid in active_video_calls:
-        username = active_video_calls[sid][2]
-        del active_video_calls[sid]
-
-    # Leave the socket room for this call
-    await sio.leave_room(sid, f"webrtc_call_{call_id}")
-
-    # Update database: remove participant from the call
-    try:
-        from app.database import get_collection
-        from bson import ObjectId
-        from datetime import datetime
-
-        collection = get_collection("video_calls")
-
-        # Remove participant
-        result = await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {"$pull": {"participants": {"user_id": ObjectId(user_id)}}}
-        )
-        print(f"Updated DB: Removed participant {user_id} from call {call_id}")
-
-        # Check if call should be ended (no participants left)
-        call = await collection.find_one({"_id": ObjectId(call_id)})
-        if call and len(call.get("participants", [])) == 0:
-            await collection.update_one(
-                {"_id": ObjectId(call_id)},
-                {
-                    "$set": {
-                        "status": "waiting",  # Reset to waiting instead of ended for meeting rooms
-                        "started_at": None    # Reset start time
-                    }
-                }
-            )
-            print(f"Reset call {call_id} to waiting state (no participants left)")
-
-    except Exception as e:
-        print(f"Error updating DB for leave: {e}")
-
-    # Notify others in the room
-    await sio.emit('webrtc_user_left', {
-        'userId': user_id,
-        'username': username or 'Unknown'
-    }, room=f"webrtc_call_{call_id}")
-
-@sio.event
-async def leave_webrtc_call(sid, data):
-    """Handle user leaving WebRTC call"""
-    call_id = data.get('callId')
-    user_id = data.get('userId')
-
-    print(f"User {user_id} leaving WebRTC call {call_id}")
-
-    # Remove from tracking
-    if sid in active_video_calls:
-        del active_video_calls[sid]
+    video_call = untrack_video_call_participant(sid)
+    if video_call:
+        username = video_call[2]
 
     # Leave the socket room for this call
     await sio.leave_room(sid, f"webrtc_call_{call_id}")
 
-    # Update database: remove participant from the call
-    try:
-        from app.database import get_collection
-        from bson import ObjectId
-        from datetime import datetime
-
-        collection = get_collection("video_calls")
-
-        # Remove participant
-        result = await collection.update_one(
-            {"_id": ObjectId(call_id)},
-            {"$pull": {"participants": {"user_id": ObjectId(user_id)}}}
-        )
-        print(f"Updated DB: Removed participant {user_id} from call {call_id}")
-
-        # Check if call should be ended (no participants left)
-        call = await collection.find_one({"_id": ObjectId(call_id)})
-        if call and len(call.get("participants", [])) == 0:
-            await collection.update_one(
-                {"_id": ObjectId(call_id)},
-                {
-                    "$set": {
-                        "status": "waiting",  # Reset to waiting instead of ended for meeting rooms
-                        "started_at": None    # Reset start time
-                    }
-                }
-            )
-            print(f"Call {call_id} reset to waiting (no participants)")
-
-    except Exception as e:
-        print(f"Error updating DB for leave: {e}")
+    # Update database and notify others in the room concurrently
+    await asyncio.gather(
+        cleanup_video_call_participant(call_id, user_id, username),
+        sio.emit('webrtc_user_left', {
+            'userId': user_id,
+            'username': username or 'Unknown'
+        }, room=f"webrtc_call_{call_id}")
+    )
 
-    # Notify others in the room
-    await sio.emit('webrtc_user_left', {
-        'userId': user_id
-    }, room=f"webrtc_call_{call_id}")
+sio.on('leave_webrtc_room', handle_webrtc_leave)
+sio.on('leave_webrtc_call', handle_webrtc_leave)
 
 @sio.event
 async def webrtc_offer(sid, data):
@@ -530,14 +529,10 @@ async def webrtc_offer(sid, data):
     from_user_id = data.get('fromUserId')
     target_user_id = data.get('targetUserId')
 
-    print(f"Received WebRTC offer from {from_user_id} to {target_user_id} for call {call_id}")
+    logger.debug("Received WebRTC offer from %s to %s for call %s", from_user_id, target_user_id, call_id)
 
     # Find target user's socket ID
-    target_socket_id = None
-    for socket_id, (stored_call_id, stored_user_id, username) in active_video_calls.items():
-        if stored_user_id == target_user_id and stored_call_id == call_id:
-            target_socket_id = socket_id
-            break
+    target_socket_id = get_video_call_participant_sid(call_id, target_user_id)
 
     if target_socket_id:
         # Send offer directly to target user
@@ -545,9 +540,9 @@ async def webrtc_offer(sid, data):
             'offer': offer,
             'fromUserId': from_user_id
         }, room=target_socket_id)
-        print(f"Forwarded offer from {from_user_id} to {target_user_id}")
+        logger.debug("Forwarded offer from %s to %s", from_user_id, target_user_id)
     else:
-        print(f"Target user {target_user_id} not found in active calls")
+        logger.debug("Target user %s not found in active calls", target_user_id)
 
 @sio.event
 async def webrtc_answer(sid, data):
@@ -557,14 +552,10 @@ async def webrtc_answer(sid, data):
     from_user_id = data.get('fromUserId')
     target_user_id = data.get('targetUserId')
 
-    print(f"Received WebRTC answer from {from_user_id} to {target_user_id} for call {call_id}")
+    logger.debug("Received WebRTC answer from %s to %s for call %s", from_user_id, target_user_id, call_id)
 
     # Find target user's socket ID
-    target_socket_id = None
-    for socket_id, (stored_call_id, stored_user_id, username) in active_video_calls.items():
-        if stored_user_id == target_user_id and stored_call_id == call_id:
-            target_socket_id = socket_id
-            break
+    target_socket_id = get_video_call_participant_sid(call_id, target_user_id)
 
     if target_socket_id:
         # Send answer directly to target user
@@ -572,9 +563,9 @@ async def webrtc_answer(sid, data):
             'answer': answer,
             'fromUserId': from_user_id
         }, room=target_socket_id)
-        print(f"Forwarded answer from {from_user_id} to {target_user_id}")
+        logger.debug("Forwarded answer from %s to %s", from_user_id, target_user_id)
     else:
-        print(f"Target user {target_user_id} not found in active calls")
+        logger.debug("Target user %s not found in active calls", target_user_id)
 
 @sio.event
 async def webrtc_ice_candidate(sid, data):
@@ -584,14 +575,10 @@ async def webrtc_ice_candidate(sid, data):
     from_user_id = data.get('fromUserId')
     target_user_id = data.get('targetUserId')
 
-    print(f"Received ICE candidate from {from_user_id} to {target_user_id} for call {call_id}")
+    logger.debug("Received ICE candidate from %s to %s for call %s", from_user_id, target_user_id, call_id)
 
     # Find target user's socket ID
-    target_socket_id = None
-    for socket_id, (stored_call_id, stored_user_id, username) in active_video_calls.items():
-        if stored_user_id == target_user_id and stored_call_id == call_id:
-            target_socket_id = socket_id
-            break
+    target_socket_id = get_video_call_participant_sid(call_id, target_user_id)
 
     if target_socket_id:
         # Send ICE candidate directly to target user
@@ -599,9 +586,9 @@ async def webrtc_ice_candidate(sid, data):
             'candidate': candidate,
             'fromUserId': from_user_id
         }, room=target_socket_id)
-        print(f"Forwarded ICE candidate from {from_user_id} to {target_user_id}")
+        logger.debug("Forwarded ICE candidate from %s to %s", from_user_id, target_user_id)
     else:
-        print(f"Target user {target_user_id} not found in active calls")
+        logger.debug("Target user %s not found in active calls", target_user_id)
 
 @sio.event
 async def webrtc_screen_share_status(sid, data):
@@ -610,7 +597,7 @@ async def webrtc_screen_share_status(sid, data):
     user_id = data.get('userId')
     is_screen_sharing = data.get('isScreenSharing')
 
-    print(f"Screen share status update: {user_id} - sharing: {is_screen_sharing} for call {call_id}")
+    logger.debug("Screen share status update: %s - sharing: %s for call %s", user_id, is_screen_sharing, call_id)
 
     # Forward screen share status to others in the room
     await sio.emit('webrtc_screen_share_status', {
@@ -618,59 +605,60 @@ async def webrtc_screen_share_status(sid, data):
         'isScreenSharing': is_screen_sharing
     }, room=f"webrtc_call_{call_id}", skip_sid=sid)
 
-async def check_and_send_chat_notification(message_data):
-    """Check if we should send chat activity notification to admins"""
+def check_chat_notification_due():
+    """
+    Check if a chat activity notification should be sent to admins.
+    Returns the notification reason, or None while inside the cooldown window.
+    """
     global last_chat_notification
 
+    current_time = time.monotonic()
+
+    if last_chat_notification is None:
+        # First message ever
+        reason = "primera actividad de chat detectada"
+    else:
+        time_diff = current_time - last_chat_notification
+        # Notify only if more than 2 hours have passed
+        if time_diff <= CHAT_NOTIFICATION_INTERVAL_SECONDS:
+            return None
+        reason = f"nueva sesión después de {int(time_diff / 3600)} horas de silencio"
+
+    # Update last notification time
+    last_chat_notification = current_time
+    return reason
+
+async def chat_notification_worker():
+    """Send queued chat notifications, coalescing a burst into a single Telegram send"""
+    while True:
+        message_data, reason = await chat_notification_queue.get()
+        # Let the rest of a burst arrive, then notify once for the first message
+        await asyncio.sleep(CHAT_NOTIFICATION_BATCH_DELAY_SECONDS)
+        while not chat_notification_queue.empty():
+            chat_notification_queue.get_nowait()
+        await send_chat_notification(message_data, reason)
+
+async def send_chat_notification(message_data, reason):
+    """Send chat activity notification to admins"""
     try:
-        current_time = datetime.utcnow()
-
-        # Determine if we should send notification
-        should_notify = False
-
-        if last_chat_notification is None:
-            # First message ever
-            should_notify = True
-            reason = "primera actividad de chat detectada"
-        else:
-            time_diff = current_time - last_chat_notification
-            # Notify if more than 2 hours have passed
-            if time_diff > timedelta(hours=2):
-                should_notify = True
-                reason = f"nueva sesión después de {int(time_diff.total_seconds() / 3600)} horas de silencio"
-
-        if should_notify:
-            # Update last notification time
-            last_chat_notification = current_time
-
-            # Get admin users with Telegram configured
-            users_collection = get_collection("users")
-            admin_users = await users_collection.find({
-                "role": "admin",
-                "is_active": True,
-                "telegram_id": {"$exists": True, "$ne": None},
-                "telegram_preferences.enabled": True,
-                "telegram_preferences.admin_notifications": True
-            }).to_list(None)
-
-            if admin_users:
-                admin_telegram_ids = [admin["telegram_id"] for admin in admin_users]
-
-                # Get user name from message data
-                user_name = message_data.get('user', 'Usuario Desconocido')
-                message_preview = message_data.get('message', '')[:50]
-                if len(message_data.get('message', '')) > 50:
-                    message_preview += "..."
-
-                # Send notification using the new chat notification method
-                await telegram_service.send_admin_chat_notification(
-                    admin_telegram_ids,
-                    user_name,
-                    message_preview,
-                    reason
-                )
-
-                print(f"Sent chat notification to {len(admin_telegram_ids)} admins: {reason}")
+        # Get admin users with Telegram configured
+        admin_telegram_ids = await get_admin_telegram_ids()
+
+        if admin_telegram_ids:
+            # Get user name from message data
+            user_name = message_data.get('user', 'Usuario Desconocido')
+            message = message_data.get('message') or ''
+            message_preview = message[:50] + ("..." if len(message) > 50 else "")
+
+            # Send notification using the new chat notification method
+            await telegram_service.send_admin_chat_notification(
+                admin_telegram_ids,
+                user_name,
+                message_preview,
+                reason
+            )
+
+            logger.debug("Sent chat notification to %d admins: %s", len(admin_telegram_ids), reason)
 
     except Exception as e:
-        print(f"Error sending chat notification: {e}")
\ No newline at end of file
+        logger.error("Error sending chat notification: %s", e)
\ No newline at end of file
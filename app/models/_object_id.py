@@ -0,0 +1,24 @@
+from bson import ObjectId
+from typing import Annotated
+from pydantic import BeforeValidator
+
+def validate_object_id(v):
+    if isinstance(v, str):
+        # 24 hex chars; checked directly instead of building a throwaway ObjectId
+        if len(v) == 24:
+            try:
+                if len(bytes.fromhex(v)) == 12:
+                    return v
+            except ValueError:
+                pass
+        raise ValueError("Invalid ObjectId format")
+    if isinstance(v, ObjectId):
+        return str(v)
+    raise ValueError("ObjectId must be a valid ObjectId or string")
+
+def new_object_id() -> str:
+    """Default factory for model ids; only called when no _id is supplied"""
+    return str(ObjectId())
+
+# Single alias imported by every model that stores a Mongo id
+PyObjectId = Annotated[str, BeforeValidator(validate_object_id)]
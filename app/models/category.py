@@ -1,17 +1,16 @@
-from pydantic import BaseModel, Field, ConfigDict
-from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
-from typing import Optional
-from app.models.post import PyObjectId
+from typing import Optional, List
+from app.models._object_id import PyObjectId, new_object_id
 
 class CategoryModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
 
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     name: str = Field(..., min_length=1, max_length=100, description="Category name")
     description: Optional[str] = Field(None, max_length=500, description="Category description")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -26,7 +25,6 @@ class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     is_active: Optional[bool] = Field(None)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class CategoryResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -36,4 +34,6 @@ class CategoryResponse(BaseModel):
     description: Optional[str]
     created_at: datetime
     updated_at: datetime
-    is_active: bool
\ No newline at end of file
+    is_active: bool
+
+CATEGORY_LIST_ADAPTER = TypeAdapter(List[CategoryResponse])
@@ -1,17 +1,16 @@
 from pydantic import BaseModel, Field, ConfigDict
-from bson import ObjectId
 from datetime import datetime
 from typing import Optional
-from app.models.post import PyObjectId
+from app.models._object_id import PyObjectId, new_object_id
 
 class ChatMessageModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
     
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     username: str = Field(..., min_length=1, max_length=50)
     message: str = Field(..., min_length=1, max_length=1000)
     created_at: datetime = Field(default_factory=datetime.utcnow)
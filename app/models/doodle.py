@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
@@ -19,6 +19,8 @@ class DoodleOption(BaseModel):
     label: str  # "Lunes 15 Oct, 14:00"
 
 class DoodleSettings(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     is_public: bool = True
     deadline: Optional[datetime] = None
     max_participants: Optional[int] = None
@@ -46,11 +48,7 @@ class DoodlePoll(BaseModel):
     created_at: datetime
     closed_at: Optional[datetime] = None
 
-    class Config:
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True)
 
 # Request/Response models
 class CreateDoodleRequest(BaseModel):
@@ -71,6 +69,11 @@ class DoodleResponse(DoodlePoll):
     total_responses: int = 0
     option_stats: Dict[str, Dict[str, int]] = Field(default_factory=dict)  # option_id -> {"yes": 5, "no": 2, "maybe": 1}
 
+class DoodleStatsResponse(BaseModel):
+    doodle_id: str
+    total_responses: int = 0
+    option_stats: Dict[str, Dict[str, int]] = Field(default_factory=dict)  # option_id -> {"yes": 5, "no": 2, "maybe": 1}
+
 class DoodleListItem(BaseModel):
     id: str
     title: str
@@ -82,4 +85,6 @@ class DoodleListItem(BaseModel):
     total_responses: int
     deadline: Optional[datetime]
     created_at: datetime
-    is_participant: bool = False  # True if current user has responded
\ No newline at end of file
+    is_participant: bool = False  # True if current user has responded
+
+DOODLE_LIST_ADAPTER = TypeAdapter(List[DoodleListItem])
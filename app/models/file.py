@@ -1,17 +1,16 @@
-from pydantic import BaseModel, Field, ConfigDict
-from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
-from typing import Optional
-from app.models.post import PyObjectId
+from typing import Optional, List
+from app.models._object_id import PyObjectId, new_object_id
 
 class FileModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
     
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     filename: str = Field(..., min_length=1)
     original_name: str = Field(..., min_length=1)
     file_type: str = Field(..., min_length=1)
@@ -62,6 +61,8 @@ class FileResponse(BaseModel):
     embed_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
 
+FILE_LIST_ADAPTER = TypeAdapter(List[FileResponse])
+
 class URLCreate(BaseModel):
     url: str = Field(..., min_length=1)
     uploaded_by: str = Field(..., min_length=1, max_length=50)
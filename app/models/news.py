@@ -1,17 +1,18 @@
-from pydantic import BaseModel, Field, ConfigDict, validator
-from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator
 from datetime import datetime
-from typing import Optional
-from app.models.post import PyObjectId
+from typing import Optional, List
+from app.models._object_id import PyObjectId, new_object_id
+
+URL_PREFIXES = ('http://', 'https://')
 
 class NewsModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
 
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     title: str = Field(..., min_length=1, max_length=500)
     url: str = Field(..., min_length=1, max_length=2000)
     comment: Optional[str] = Field(None, max_length=1000)
@@ -19,9 +20,10 @@ class NewsModel(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
-    @validator('url')
+    @field_validator('url')
+    @classmethod
     def validate_url(cls, v):
-        if not v.startswith(('http://', 'https://')):
+        if not v.startswith(URL_PREFIXES):
             raise ValueError('URL must start with http:// or https://')
         return v
 
@@ -30,12 +32,12 @@ class NewsCreate(BaseModel):
     url: str = Field(..., min_length=1, max_length=2000)
     comment: Optional[str] = Field(None, max_length=1000)
 
-    @validator('url')
+    @field_validator('url')
+    @classmethod
     def validate_url(cls, v):
-        if not v or not isinstance(v, str):
-            raise ValueError('URL is required and must be a string')
+        # Runs after str/min_length validation, so v is already a non-empty string
         v = v.strip()
-        if not v.startswith(('http://', 'https://')):
+        if not v.startswith(URL_PREFIXES):
             raise ValueError('URL must start with http:// or https://')
         if len(v) < 10:  # Minimum reasonable URL length
             raise ValueError('URL too short')
@@ -46,9 +48,10 @@ class NewsUpdate(BaseModel):
     url: Optional[str] = Field(None, min_length=1, max_length=2000)
     comment: Optional[str] = Field(None, max_length=1000)
 
-    @validator('url')
+    @field_validator('url')
+    @classmethod
     def validate_url(cls, v):
-        if v is not None and not v.startswith(('http://', 'https://')):
+        if v is not None and not v.startswith(URL_PREFIXES):
             raise ValueError('URL must start with http:// or https://')
         return v
 
@@ -61,4 +64,6 @@ class NewsResponse(BaseModel):
     comment: Optional[str] = None
     created_by: str
     created_at: datetime
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+NEWS_LIST_ADAPTER = TypeAdapter(List[NewsResponse])
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
-from app.models.post import PyObjectId
 
 class EmailNotificationCreate(BaseModel):
     subject: str = Field(..., min_length=1, max_length=200, description="Email subject")
@@ -1,28 +1,17 @@
 from pydantic import BaseModel, Field, ConfigDict
-from bson import ObjectId
 from datetime import datetime
-from typing import Optional, Annotated
-from pydantic import BeforeValidator
-
-def validate_object_id(v):
-    if isinstance(v, ObjectId):
-        return str(v)
-    if isinstance(v, str):
-        if ObjectId.is_valid(v):
-            return v
-        raise ValueError("Invalid ObjectId format")
-    raise ValueError("ObjectId must be a valid ObjectId or string")
-
-PyObjectId = Annotated[str, BeforeValidator(validate_object_id)]
+from typing import Optional, List
+from pydantic import TypeAdapter
+from app.models._object_id import PyObjectId, new_object_id
 
 class PostModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
 
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     title: str = Field(..., min_length=1, max_length=200)
     content: str = Field(..., min_length=1)
     author_name: str = Field(..., min_length=1, max_length=50)
@@ -47,7 +36,6 @@ class PostUpdate(BaseModel):
     category_id: Optional[str] = Field(None, description="Category ID")
     is_published: Optional[bool] = Field(None, description="Whether to publish or unpublish the post")
     pin_priority: Optional[int] = Field(None, description="Pin priority: 0=Normal, 1=Low, 2=Medium, 3=High")
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class PostPublish(BaseModel):
     is_published: bool = Field(..., description="Whether to publish or unpublish the post")
@@ -69,4 +57,6 @@ class PostResponse(BaseModel):
     pin_priority: int = Field(default=0, description="Pin priority: 0=Normal, 1=Low, 2=Medium, 3=High")
     created_at: datetime
     updated_at: datetime
-    comments_count: int = Field(default=0, description="Number of comments on this post")
\ No newline at end of file
+    comments_count: int = Field(default=0, description="Number of comments on this post")
+
+POST_LIST_ADAPTER = TypeAdapter(List[PostResponse])
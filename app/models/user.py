@@ -1,36 +1,51 @@
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from bson import ObjectId
 from datetime import datetime
+from functools import cached_property
+from bson import ObjectId
 from typing import Optional, Dict
 from enum import Enum
-from app.models.post import PyObjectId
+from app.models._object_id import PyObjectId, new_object_id
 
 class UserRole(str, Enum):
     ADMIN = "admin"
     NORMAL = "normal"
 
 class EmailPreferences(BaseModel):
+    # Immutable so one default instance can be shared instead of copied per model
+    model_config = ConfigDict(frozen=True)
+
     new_posts: bool = Field(default=True, description="Receive notifications for new posts")
     admin_notifications: bool = Field(default=True, description="Receive admin broadcast messages")
     comment_replies: bool = Field(default=True, description="Receive notifications for comment replies")
     new_comments: bool = Field(default=True, description="Receive notifications for any new comment on any post")
     weekly_digest: bool = Field(default=False, description="Receive weekly activity digest")
 
+    def __deepcopy__(self, memo=None):
+        return self
+
 class TelegramPreferences(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     enabled: bool = Field(default=False, description="Enable Telegram notifications")
     login_notifications: bool = Field(default=True, description="Notify on login events")
     new_posts: bool = Field(default=True, description="Notify on new posts")
     comment_replies: bool = Field(default=True, description="Notify on comment replies")
     admin_notifications: bool = Field(default=True, description="Receive admin broadcast messages")
 
+    def __deepcopy__(self, memo=None):
+        return self
+
+DEFAULT_EMAIL_PREFERENCES = EmailPreferences()
+DEFAULT_TELEGRAM_PREFERENCES = TelegramPreferences()
+
 class UserModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
     
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     email: EmailStr = Field(..., description="Email for login (unique)")
     name: str = Field(..., min_length=1, max_length=50, description="Display name")
     password_hash: str = Field(..., description="Hashed password")
@@ -39,8 +54,8 @@ class UserModel(BaseModel):
     avatar: Optional[str] = Field(None, description="Avatar image URL")
     phone: Optional[str] = Field(None, max_length=20, description="Phone number")
     telegram_id: Optional[str] = Field(None, description="Telegram user ID for notifications")
-    email_preferences: EmailPreferences = Field(default_factory=EmailPreferences, description="Email notification preferences")
-    telegram_preferences: TelegramPreferences = Field(default_factory=TelegramPreferences, description="Telegram notification preferences")
+    email_preferences: EmailPreferences = Field(default=DEFAULT_EMAIL_PREFERENCES, description="Email notification preferences")
+    telegram_preferences: TelegramPreferences = Field(default=DEFAULT_TELEGRAM_PREFERENCES, description="Telegram notification preferences")
     last_seen: Optional[datetime] = Field(None, description="Last activity timestamp for presence tracking")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -64,7 +79,6 @@ class UserUpdate(BaseModel):
     email_preferences: Optional[EmailPreferences] = Field(None)
     telegram_preferences: Optional[TelegramPreferences] = Field(None)
     last_seen: Optional[datetime] = Field(None)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class UserResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -98,8 +112,16 @@ class PasswordChange(BaseModel):
     new_password: str = Field(..., min_length=6, description="New password (min 6 chars)")
 
 class TokenData(BaseModel):
+    # Never modified after decoding the token; safe to share from the token cache
+    model_config = ConfigDict(frozen=True)
+
     email: str
     user_id: str
     name: str
     role: UserRole
-    is_active: bool
\ No newline at end of file
+    is_active: bool
+
+    @cached_property
+    def user_oid(self) -> ObjectId:
+        """user_id as an ObjectId, parsed once per token (TokenData is reused from the token cache)"""
+        return ObjectId(self.user_id)
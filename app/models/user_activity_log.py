@@ -1,9 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict
-from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from enum import Enum
-from app.models.post import PyObjectId
+from app.models._object_id import PyObjectId, new_object_id
 
 class ActivityEventType(str, Enum):
     LOGIN = "login"
@@ -21,10 +20,10 @@ class UserActivityLogModel(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        defer_build=True
     )
 
-    id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     username: str = Field(..., min_length=1, max_length=50)
     event_type: ActivityEventType = Field(...)
@@ -53,6 +52,8 @@ class UserActivityLogResponse(BaseModel):
     success: bool
     additional_info: Optional[Dict[str, Any]] = None
 
+ACTIVITY_LOG_LIST_ADAPTER = TypeAdapter(List[UserActivityLogResponse])
+
 class ActivityLogFilters(BaseModel):
     username: Optional[str] = None
     event_type: Optional[ActivityEventType] = None
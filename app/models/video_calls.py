@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ConfigDict, validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -45,12 +45,7 @@ class VideoCallModel(BaseModel):
     is_public: bool = True
     password: Optional[str] = None
 
-    class Config:
-        populate_by_name = True
-        validate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class VideoCallResponse(VideoCallModel):
@@ -87,11 +82,6 @@ class CallHistoryResponse(BaseModel):
     duration: Optional[float] = None  # in seconds
     participant_count: int
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class ScreenShareRequest(BaseModel):
     call_id: str
@@ -5,18 +5,53 @@ from datetime import datetime, timedelta
 from app.models.user_activity_log import (
     UserActivityLogResponse,
     ActivityLogFilters,
-    ActivityEventType
+    ActivityEventType,
+    ACTIVITY_LOG_LIST_ADAPTER
 )
 from pydantic import BaseModel
-from app.database import get_collection
+from app.database import get_collection, USERNAME_COLLATION, ACTIVITY_STATS_INDEX
 from app.auth import get_current_admin_user
 from app.models.user import TokenData
+from app.utils.responses import adapter_response
 
 router = APIRouter()
 
+# Fields UserActivityLogResponse serializes; anything else stored on a log stays in Mongo
+ACTIVITY_LOG_PROJECTION = {
+    "_id": 1, "timestamp": 1, "username": 1, "event_type": 1,
+    "ip_address": 1, "user_agent": 1, "success": 1, "additional_info": 1
+}
+
 class BulkDeleteUsersRequest(BaseModel):
     usernames: List[str]
 
+def build_log_query(
+    username: Optional[str],
+    event_type: Optional[ActivityEventType],
+    success: Optional[bool],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> dict:
+    """Build the activity log filter, including only the filters that were given"""
+    query = {}
+
+    if username:
+        query["username"] = username  # Case-insensitive through USERNAME_COLLATION
+    if event_type:
+        query["event_type"] = event_type  # str subclass; BSON encodes it as its value
+    if success is not None:
+        query["success"] = success
+
+    # Date range filtering
+    if start_date and end_date:
+        query["timestamp"] = {"$gte": start_date, "$lte": end_date}
+    elif start_date:
+        query["timestamp"] = {"$gte": start_date}
+    elif end_date:
+        query["timestamp"] = {"$lte": end_date}
+
+    return query
+
 @router.get("/", response_model=List[UserActivityLogResponse])
 async def get_activity_logs(
     username: Optional[str] = Query(None, description="Filter by username"),
@@ -36,37 +71,19 @@ async def get_activity_logs(
     try:
         collection = get_collection("user_activity_logs")
 
-        # Build query filter
-        query = {}
-
-        if username:
-            query["username"] = {"$regex": username, "$options": "i"}  # Case-insensitive search
-
-        if event_type:
-            query["event_type"] = event_type.value
-
-        if success is not None:
-            query["success"] = success
-
-        # Date range filtering
-        if start_date or end_date:
-            query["timestamp"] = {}
-            if start_date:
-                query["timestamp"]["$gte"] = start_date
-            if end_date:
-                query["timestamp"]["$lte"] = end_date
+        query = build_log_query(username, event_type, success, start_date, end_date)
 
         # Execute query with pagination
-        cursor = collection.find(query).sort("timestamp", -1).skip(offset).limit(limit)
+        cursor = collection.find(query, ACTIVITY_LOG_PROJECTION).sort("timestamp", -1).skip(offset).limit(limit)
+        if username:
+            cursor = cursor.collation(USERNAME_COLLATION)
 
-        logs = []
-        async for log_doc in cursor:
+        logs = await cursor.to_list(length=limit)
+        for log_doc in logs:
             # Convert ObjectId to string and map _id to id
-            log_doc["id"] = str(log_doc["_id"])
-            log_doc["_id"] = str(log_doc["_id"])
-            logs.append(UserActivityLogResponse(**log_doc))
+            log_doc["id"] = log_doc["_id"] = str(log_doc["_id"])
 
-        return logs
+        return adapter_response(ACTIVITY_LOG_LIST_ADAPTER, logs)
 
     except Exception as e:
         raise HTTPException(
@@ -91,7 +108,7 @@ async def get_activity_stats(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
 
-        # Aggregation pipeline for statistics
+        # Aggregation pipeline for statistics: one document per event type with its counts
         pipeline = [
             {
                 "$match": {
@@ -100,54 +117,45 @@ async def get_activity_stats(
             },
             {
                 "$group": {
-                    "_id": {
-                        "event_type": "$event_type",
-                        "success": "$success"
-                    },
-                    "count": {"$sum": 1}
+                    "_id": "$event_type",
+                    "successful": {"$sum": {"$cond": ["$success", 1, 0]}},
+                    "total": {"$sum": 1}
                 }
             }
         ]
 
         # Execute aggregation
-        stats_cursor = collection.aggregate(pipeline)
-        raw_stats = []
-        async for stat in stats_cursor:
-            raw_stats.append(stat)
+        # Served from the covering index; the grouped result is tiny, so it never needs to spill
+        raw_stats = await collection.aggregate(
+            pipeline, allowDiskUse=False, hint=ACTIVITY_STATS_INDEX
+        ).to_list(None)
+
+        # Shape the per-event counts; totals are sums over a handful of event types
+        events = {
+            stat["_id"]: {
+                "successful": stat["successful"],
+                "failed": stat["total"] - stat["successful"],
+                "total": stat["total"]
+            }
+            for stat in raw_stats
+        }
+        total_events = sum(event["total"] for event in events.values())
+        successful_events = sum(event["successful"] for event in events.values())
 
-        # Process statistics
         stats = {
             "period": {
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
                 "days": days
             },
-            "events": {},
+            "events": events,
             "totals": {
-                "total_events": 0,
-                "successful_events": 0,
-                "failed_events": 0
+                "total_events": total_events,
+                "successful_events": successful_events,
+                "failed_events": total_events - successful_events
             }
         }
 
-        for stat in raw_stats:
-            event_type = stat["_id"]["event_type"]
-            success = stat["_id"]["success"]
-            count = stat["count"]
-
-            if event_type not in stats["events"]:
-                stats["events"][event_type] = {"successful": 0, "failed": 0, "total": 0}
-
-            if success:
-                stats["events"][event_type]["successful"] = count
-                stats["totals"]["successful_events"] += count
-            else:
-                stats["events"][event_type]["failed"] = count
-                stats["totals"]["failed_events"] += count
-
-            stats["events"][event_type]["total"] += count
-            stats["totals"]["total_events"] += count
-
         return stats
 
     except Exception as e:
@@ -172,15 +180,13 @@ async def get_user_activity_logs(
 
         # Query for specific user
         query = {"username": username}
-        cursor = collection.find(query).sort("timestamp", -1).limit(limit)
+        cursor = collection.find(query, ACTIVITY_LOG_PROJECTION).sort("timestamp", -1).limit(limit).collation(USERNAME_COLLATION)
 
-        logs = []
-        async for log_doc in cursor:
-            log_doc["id"] = str(log_doc["_id"])
-            log_doc["_id"] = str(log_doc["_id"])
-            logs.append(UserActivityLogResponse(**log_doc))
+        logs = await cursor.to_list(length=limit)
+        for log_doc in logs:
+            log_doc["id"] = log_doc["_id"] = str(log_doc["_id"])
 
-        return logs
+        return adapter_response(ACTIVITY_LOG_LIST_ADAPTER, logs)
 
     except Exception as e:
         raise HTTPException(
@@ -240,14 +246,15 @@ async def bulk_delete_user_activity_logs(
 
         collection = get_collection("user_activity_logs")
 
-        # First, get a count of what we're about to delete for each user
-        deletion_summary = {}
-        total_to_delete = 0
-
-        for username in request.usernames:
-            count = await collection.count_documents({"username": username})
-            deletion_summary[username] = count
-            total_to_delete += count
+        # First, get a count of what we're about to delete for each user (one round-trip)
+        deletion_summary = {username: 0 for username in request.usernames}
+        pipeline = [
+            {"$match": {"username": {"$in": request.usernames}}},
+            {"$group": {"_id": "$username", "count": {"$sum": 1}}}
+        ]
+        async for count_doc in collection.aggregate(pipeline):
+            deletion_summary[count_doc["_id"]] = count_doc["count"]
+        total_to_delete = sum(deletion_summary.values())
 
         if total_to_delete == 0:
             return {
@@ -260,9 +267,9 @@ async def bulk_delete_user_activity_logs(
         # Perform the bulk deletion
         result = await collection.delete_many({"username": {"$in": request.usernames}})
 
-        # Log this admin action
+        # Log this admin action (written in the background)
         from app.services.activity_logger import ActivityLogger
-        await ActivityLogger.log_activity(
+        ActivityLogger.queue_activity(
             username=current_admin.name,
             event_type=ActivityEventType.ADMIN_ACTION,
             success=True,
@@ -287,7 +294,7 @@ async def bulk_delete_user_activity_logs(
         # Log the failed attempt
         try:
             from app.services.activity_logger import ActivityLogger
-            await ActivityLogger.log_activity(
+            ActivityLogger.queue_activity(
                 username=current_admin.name,
                 event_type=ActivityEventType.ADMIN_ACTION,
                 success=False,
@@ -1,23 +1,90 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List, Dict, Any
 import json
+import time
+import logging
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.models.user import (
     UserModel, UserCreate, UserUpdate, UserResponse, 
-    UserLogin, UserProfile, PasswordChange, TokenData, UserRole
+    UserLogin, UserProfile, PasswordChange, TokenData, UserRole,
+    DEFAULT_EMAIL_PREFERENCES, DEFAULT_TELEGRAM_PREFERENCES
 )
 from app.database import get_collection
 from app.auth import (
-    authenticate_user, create_user_token, hash_password, verify_password,
-    get_current_active_user, get_current_admin_user
+    authenticate_user, create_user_token, hash_password_async, verify_password_async,
+    get_current_active_user, get_current_admin_user, invalidate_user_cache
 )
 from datetime import datetime, timedelta
-from app.utils.presence import get_online_users, cleanup_offline_users, is_user_online
+from app.utils.presence import (
+    get_online_users, cleanup_offline_users, is_user_online, record_last_seen, ONLINE_THRESHOLD_MINUTES
+)
+from app.utils.telegram_admins import get_admin_telegram_ids, invalidate_admin_telegram_ids
+from app.utils.responses import ORJSONResponse
 from app.services.activity_logger import ActivityLogger
 from app.services.telegram_service import telegram_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# User reads that are returned to clients never need the password hash
+USER_PUBLIC_PROJECTION = {"password_hash": 0}
+
+# Shapes user documents into UserResponse's JSON form inside MongoDB, so the admin user list
+# can be serialized straight from the driver's dicts. Only these fields leave the database
+# (never password_hash); defaults match what UserResponse validation would fill in.
+USER_LIST_PIPELINE = [
+    {"$sort": {"created_at": -1}},
+    {"$project": {
+        "_id": {"$toString": "$_id"},
+        "email": 1,
+        "name": 1,
+        "role": 1,
+        "is_active": {"$ifNull": ["$is_active", True]},
+        "avatar": {"$ifNull": ["$avatar", None]},
+        "phone": {"$ifNull": ["$phone", None]},
+        "telegram_id": {"$ifNull": ["$telegram_id", None]},
+        "email_preferences": {"$mergeObjects": [
+            DEFAULT_EMAIL_PREFERENCES.model_dump(),
+            {"$ifNull": ["$email_preferences", {}]}
+        ]},
+        "telegram_preferences": {"$cond": [
+            {"$eq": [{"$type": "$telegram_preferences"}, "object"]},
+            {"$mergeObjects": [DEFAULT_TELEGRAM_PREFERENCES.model_dump(), "$telegram_preferences"]},
+            None
+        ]},
+        "last_seen": {"$ifNull": ["$last_seen", None]},
+        "created_at": 1,
+        "updated_at": 1
+    }}
+]
+
+# Presence only needs minute resolution (ONLINE_THRESHOLD_MINUTES), so each user's
+# last_seen is written at most once per interval per worker
+HEARTBEAT_WRITE_INTERVAL_SECONDS = 30
+HEARTBEAT_CACHE_MAX_SIZE = 4096
+# user_id -> monotonic time of the last last_seen write, least recently written first
+_last_heartbeat_write: Dict[str, float] = {}
+
+def parse_user_id(user_id: str) -> ObjectId:
+    """Parse a user id path parameter once, rejecting malformed ids with a 400"""
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+
+def duplicate_user_error(e: DuplicateKeyError) -> HTTPException:
+    """Map a users unique-index violation to the 400 for the field that collided"""
+    key_pattern = (e.details or {}).get("keyPattern") or {}
+    if "email" in key_pattern or (not key_pattern and "email" in str(e)):
+        detail = "Email already registered"
+    else:
+        detail = "Name already taken. Please choose a different name."
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
 
 @router.post("/login")
 async def login(user_credentials: UserLogin, request: Request):
@@ -38,11 +105,11 @@ async def login(user_credentials: UserLogin, request: Request):
                 detail="Incorrect name or password"
             )
 
-        # Update last_seen timestamp on login
+        # Update last_seen timestamp on login (stamped by the server)
         users_collection = get_collection("users")
         await users_collection.update_one(
-            {"_id": ObjectId(user["_id"])},
-            {"$set": {"last_seen": datetime.utcnow()}}
+            {"_id": user["_id"]},
+            {"$currentDate": {"last_seen": True}}
         )
 
         # Log successful login
@@ -63,22 +130,13 @@ async def login(user_credentials: UserLogin, request: Request):
                 )
             except Exception as e:
                 # Don't fail login if Telegram notification fails
-                print(f"Failed to send Telegram login notification to user: {e}")
+                logger.warning("Failed to send Telegram login notification to user: %s", e)
 
         # Send Telegram notification to all admins about any user login
         try:
-            users_collection = get_collection("users")
-            admin_users = await users_collection.find({
-                "role": "admin",
-                "is_active": True,
-                "telegram_id": {"$exists": True, "$ne": None},
-                "telegram_preferences.enabled": True,
-                "telegram_preferences.admin_notifications": True
-            }).to_list(None)
-
-            if admin_users:
-                admin_telegram_ids = [admin["telegram_id"] for admin in admin_users]
+            admin_telegram_ids = await get_admin_telegram_ids()
 
+            if admin_telegram_ids:
                 # Use the admin notification method for login monitoring
                 await telegram_service.send_admin_login_notification(
                     admin_telegram_ids,
@@ -88,7 +146,7 @@ async def login(user_credentials: UserLogin, request: Request):
 
         except Exception as e:
             # Don't fail login if admin notification fails
-            print(f"Failed to send admin login notifications: {e}")
+            logger.warning("Failed to send admin login notifications: %s", e)
 
         access_token = create_user_token(user)
 
@@ -104,7 +162,8 @@ async def login(user_credentials: UserLogin, request: Request):
                 "is_active": user.get("is_active", True)
             }
         }
-        return response_data
+        # Returned as a Response so FastAPI skips its jsonable_encoder pass
+        return ORJSONResponse(response_data)
 
     except HTTPException:
         raise
@@ -121,35 +180,42 @@ async def logout(
 ):
     """Log user logout event"""
     try:
-        print(f"Logout endpoint called for user: {current_user.name}")
+        logger.debug("Logout endpoint called for user: %s", current_user.name)
         # Log the logout event before the token is invalidated
         result = await ActivityLogger.log_logout(
             username=current_user.name,
             request=request
         )
-        print(f"Logout logging result: {result}")
+        logger.debug("Logout logging result: %s", result)
         return {"message": "Logout logged successfully", "logged": result}
     except Exception as e:
         # Even if logging fails, we should allow the logout to proceed
-        print(f"Error logging logout: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error logging logout: %s", e)
         return {"message": "Logout completed (logging error occurred)", "error": str(e)}
 
 @router.post("/heartbeat")
 async def heartbeat(current_user: TokenData = Depends(get_current_active_user)):
     """Update user's last_seen timestamp for presence tracking"""
     try:
-        users_collection = get_collection("users")
         timestamp = datetime.utcnow()
-        result = await users_collection.update_one(
-            {"_id": ObjectId(current_user.user_id)},
-            {"$set": {"last_seen": timestamp}}
-        )
-        print(f"Heartbeat for user {current_user.user_id} - matched: {result.matched_count}, modified: {result.modified_count}, timestamp: {timestamp}")  # Debug log
-        return {"status": "success", "timestamp": timestamp}
+        now = time.monotonic()
+        last_write = _last_heartbeat_write.get(current_user.user_id)
+        if last_write is not None and now - last_write < HEARTBEAT_WRITE_INTERVAL_SECONDS:
+            # Recently written; the stored last_seen is still well within the online threshold
+            return ORJSONResponse({"status": "success", "timestamp": timestamp})
+
+        # Re-insert so the dict stays ordered by last write, then drop the oldest if full
+        _last_heartbeat_write.pop(current_user.user_id, None)
+        if len(_last_heartbeat_write) >= HEARTBEAT_CACHE_MAX_SIZE:
+            _last_heartbeat_write.pop(next(iter(_last_heartbeat_write)))
+        _last_heartbeat_write[current_user.user_id] = now
+
+        # Written with other users' heartbeats by the presence flusher
+        record_last_seen(current_user.user_oid, timestamp)
+        logger.debug("Heartbeat for user %s queued, timestamp: %s", current_user.user_id, timestamp)
+        return ORJSONResponse({"status": "success", "timestamp": timestamp})
     except Exception as e:
-        print(f"Error in heartbeat: {e}")  # Debug log
+        logger.error("Error in heartbeat: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error updating presence"
@@ -159,7 +225,7 @@ async def heartbeat(current_user: TokenData = Depends(get_current_active_user)):
 async def get_current_user_profile(current_user: TokenData = Depends(get_current_active_user)):
     """Get current user profile"""
     users_collection = get_collection("users")
-    user = await users_collection.find_one({"_id": ObjectId(current_user.user_id)})
+    user = await users_collection.find_one({"_id": current_user.user_oid}, USER_PUBLIC_PROJECTION)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -171,13 +237,9 @@ async def get_current_user_profile(current_user: TokenData = Depends(get_current
     user.setdefault("phone", None)
     user.setdefault("last_seen", None)
     # Set default email preferences for existing users
-    user.setdefault("email_preferences", {
-        "new_posts": True,
-        "admin_notifications": True,
-        "comment_replies": True,
-        "weekly_digest": False
-    })
-    return UserResponse(**user)
+    user.setdefault("email_preferences", DEFAULT_EMAIL_PREFERENCES)
+    # response_model validates the document once on the way out
+    return user
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
@@ -187,20 +249,28 @@ async def update_current_user_profile(
     """Update current user profile"""
     users_collection = get_collection("users")
     
-    update_data = {k: v for k, v in profile_data.model_dump().items() if v is not None}
+    # Only the fields the client sent; nested preference models are still dumped whole
+    update_data = profile_data.model_dump(include=profile_data.model_fields_set, exclude_none=True)
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await users_collection.update_one(
-        {"_id": ObjectId(current_user.user_id)},
-        {"$set": update_data}
-    )
+    try:
+        updated_user = await users_collection.find_one_and_update(
+            {"_id": current_user.user_oid},
+            {"$set": update_data},
+            projection=USER_PUBLIC_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError as e:
+        raise duplicate_user_error(e)
     
-    if result.matched_count == 0:
+    if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
+
+    if "telegram_id" in update_data:
+        invalidate_admin_telegram_ids()
     
-    updated_user = await users_collection.find_one({"_id": ObjectId(current_user.user_id)})
     updated_user["_id"] = str(updated_user["_id"])
-    return UserResponse(**updated_user)
+    return updated_user
 
 @router.post("/change-password")
 async def change_password(
@@ -210,13 +280,13 @@ async def change_password(
 ):
     """Change user password"""
     users_collection = get_collection("users")
-    user = await users_collection.find_one({"_id": ObjectId(current_user.user_id)})
+    user = await users_collection.find_one({"_id": current_user.user_oid}, {"password_hash": 1})
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Verify current password
-    if not verify_password(password_data.current_password, user["password_hash"]):
+    if not await verify_password_async(password_data.current_password, user["password_hash"]):
         # Log failed password change attempt
         await ActivityLogger.log_password_change(
             username=current_user.name,
@@ -229,9 +299,9 @@ async def change_password(
         )
     
     # Update password
-    new_password_hash = hash_password(password_data.new_password)
+    new_password_hash = await hash_password_async(password_data.new_password)
     await users_collection.update_one(
-        {"_id": ObjectId(current_user.user_id)},
+        {"_id": current_user.user_oid},
         {"$set": {"password_hash": new_password_hash, "updated_at": datetime.utcnow()}}
     )
 
@@ -253,25 +323,9 @@ async def create_user(
     """Create new user (Admin only)"""
     users_collection = get_collection("users")
     
-    # Check if email already exists
-    existing_email = await users_collection.find_one({"email": user_data.email})
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if name already exists (since names are used for login)
-    existing_name = await users_collection.find_one({"name": user_data.name})
-    if existing_name:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Name already taken. Please choose a different name."
-        )
-    
     # Create user
     user_dict = user_data.model_dump(exclude={"password"})
-    user_dict["password_hash"] = hash_password(user_data.password)
+    user_dict["password_hash"] = await hash_password_async(user_data.password)
     user_dict["created_at"] = datetime.utcnow()
     user_dict["updated_at"] = datetime.utcnow()
     # Ensure required fields are set in the database
@@ -287,11 +341,15 @@ async def create_user(
         "weekly_digest": False
     }
     
-    result = await users_collection.insert_one(user_dict)
-    created_user = await users_collection.find_one({"_id": result.inserted_id})
+    # Unique indexes on email and name reject duplicates (names are used for login)
+    try:
+        await users_collection.insert_one(user_dict)
+    except DuplicateKeyError as e:
+        raise duplicate_user_error(e)
     
-    created_user["_id"] = str(created_user["_id"])
-    return UserResponse(**created_user)
+    # insert_one stored user_dict as-is and added its _id
+    user_dict["_id"] = str(user_dict["_id"])
+    return user_dict
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
@@ -300,27 +358,12 @@ async def get_all_users(
     """Get all users (Admin only)"""
     try:
         users_collection = get_collection("users")
-        users = []
-        
-        async for user in users_collection.find().sort("created_at", -1):
-            user["_id"] = str(user["_id"])
-            # Ensure required fields exist with defaults
-            user.setdefault("is_active", True)
-            user.setdefault("avatar", None)
-            user.setdefault("phone", None)
-            # Set default email preferences for existing users
-            user.setdefault("email_preferences", {
-                "new_posts": True,
-                "admin_notifications": True,
-                "comment_replies": True,
-                "weekly_digest": False
-            })
-            user.setdefault("last_seen", None)
-            users.append(UserResponse(**user))
-        
-        return users
+        # The admin user list is unpaginated; documents arrive already shaped by the pipeline
+        users = await users_collection.aggregate(USER_LIST_PIPELINE).to_list(None)
+        # Skips the response_model pass; kept on the route for the OpenAPI schema
+        return ORJSONResponse(users)
     except Exception as e:
-        print(f"Error in get_all_users: {e}")
+        logger.error("Error in get_all_users: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -329,11 +372,10 @@ async def get_user(
     current_admin: TokenData = Depends(get_current_admin_user)
 ):
     """Get user by ID (Admin only)"""
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    user_oid = parse_user_id(user_id)
     
     users_collection = get_collection("users")
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_collection.find_one({"_id": user_oid}, USER_PUBLIC_PROJECTION)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -345,13 +387,9 @@ async def get_user(
     user.setdefault("phone", None)
     user.setdefault("last_seen", None)
     # Set default email preferences for existing users
-    user.setdefault("email_preferences", {
-        "new_posts": True,
-        "admin_notifications": True,
-        "comment_replies": True,
-        "weekly_digest": False
-    })
-    return UserResponse(**user)
+    user.setdefault("email_preferences", DEFAULT_EMAIL_PREFERENCES)
+    # response_model validates the document once on the way out
+    return user
 
 @router.put("/users/{user_id}", response_model=UserResponse)
 async def update_user(
@@ -360,49 +398,33 @@ async def update_user(
     current_admin: TokenData = Depends(get_current_admin_user)
 ):
     """Update user (Admin only)"""
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    user_oid = parse_user_id(user_id)
     
     users_collection = get_collection("users")
     
-    # Check if email already exists for a different user
-    if user_data.email:
-        existing_email = await users_collection.find_one({
-            "email": user_data.email,
-            "_id": {"$ne": ObjectId(user_id)}
-        })
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Check if name already exists for a different user
-    if user_data.name:
-        existing_name = await users_collection.find_one({
-            "name": user_data.name,
-            "_id": {"$ne": ObjectId(user_id)}
-        })
-        if existing_name:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Name already taken. Please choose a different name."
-            )
-    
-    update_data = {k: v for k, v in user_data.model_dump().items() if v is not None}
+    update_data = user_data.model_dump(include=user_data.model_fields_set, exclude_none=True)
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": update_data}
-    )
+    # Unique indexes on email and name reject a value already used by another user
+    try:
+        updated_user = await users_collection.find_one_and_update(
+            {"_id": user_oid},
+            {"$set": update_data},
+            projection=USER_PUBLIC_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError as e:
+        raise duplicate_user_error(e)
     
-    if result.matched_count == 0:
+    if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
+
+    if "is_active" in update_data:
+        invalidate_user_cache()
+    invalidate_admin_telegram_ids()
     
-    updated_user = await users_collection.find_one({"_id": ObjectId(user_id)})
     updated_user["_id"] = str(updated_user["_id"])
-    return UserResponse(**updated_user)
+    return updated_user
 
 @router.delete("/users/{user_id}")
 async def delete_user(
@@ -410,8 +432,7 @@ async def delete_user(
     current_admin: TokenData = Depends(get_current_admin_user)
 ):
     """Delete user (Admin only)"""
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    user_oid = parse_user_id(user_id)
     
     # Prevent admin from deleting themselves
     if user_id == current_admin.user_id:
@@ -421,10 +442,13 @@ async def delete_user(
         )
     
     users_collection = get_collection("users")
-    result = await users_collection.delete_one({"_id": ObjectId(user_id)})
+    result = await users_collection.delete_one({"_id": user_oid})
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+
+    invalidate_user_cache()
+    invalidate_admin_telegram_ids()
     
     return {"message": "User deleted successfully"}
 
@@ -434,8 +458,7 @@ async def toggle_user_status(
     current_admin: TokenData = Depends(get_current_admin_user)
 ):
     """Toggle user active/inactive status (Admin only)"""
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    user_oid = parse_user_id(user_id)
     
     # Prevent admin from deactivating themselves
     if user_id == current_admin.user_id:
@@ -445,17 +468,23 @@ async def toggle_user_status(
         )
     
     users_collection = get_collection("users")
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    # Flip the flag server-side (missing is_active counts as active) and read back the result
+    user = await users_collection.find_one_and_update(
+        {"_id": user_oid},
+        [{"$set": {
+            "is_active": {"$not": [{"$ifNull": ["$is_active", True]}]},
+            "updated_at": datetime.utcnow()
+        }}],
+        projection={"is_active": 1},
+        return_document=ReturnDocument.AFTER
+    )
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    new_status = not user.get("is_active", True)
-    
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"is_active": new_status, "updated_at": datetime.utcnow()}}
-    )
+    new_status = user["is_active"]
+    invalidate_user_cache()
+    invalidate_admin_telegram_ids()
     
     action = "activated" if new_status else "deactivated"
     return {"message": f"User {action} successfully"}
@@ -465,12 +494,10 @@ async def get_currently_online_users(current_user: TokenData = Depends(get_curre
     """Get list of currently online users"""
     try:
         online_users = await get_online_users()
-        print(f"Online users endpoint called - found {len(online_users)} users")  # Debug log
-        for user in online_users:
-            print(f"  - {user['name']} (last_seen: {user['last_seen']})")  # Debug log
-        return {"online_users": online_users, "count": len(online_users)}
+        logger.debug("Online users endpoint called - found %d users", len(online_users))
+        return ORJSONResponse({"online_users": online_users, "count": len(online_users)})
     except Exception as e:
-        print(f"Error in get_currently_online_users: {e}")  # Debug log
+        logger.error("Error in get_currently_online_users: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error fetching online users"
@@ -481,7 +508,7 @@ async def cleanup_offline_users_endpoint(current_admin: TokenData = Depends(get_
     """Cleanup offline users (Admin only)"""
     try:
         count = await cleanup_offline_users()
-        return {"message": f"Marked {count} users as offline"}
+        return ORJSONResponse({"message": f"Marked {count} users as offline"})
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -493,22 +520,24 @@ async def debug_users_presence(current_admin: TokenData = Depends(get_current_ad
     """Debug endpoint to check all users and their last_seen status (Admin only)"""
     try:
         users_collection = get_collection("users")
-        threshold = datetime.utcnow() - timedelta(minutes=5)  # 5 minute threshold
-
-        debug_info = []
-        async for user in users_collection.find({}, {"name": 1, "last_seen": 1, "is_active": 1}):
-            debug_info.append({
-                "id": str(user["_id"]),
-                "name": user.get("name"),
-                "last_seen": user.get("last_seen"),
-                "is_active": user.get("is_active", True),
-                "is_online": user.get("last_seen") and user.get("last_seen") > threshold if user.get("last_seen") else False
-            })
-
-        return {
+        threshold = datetime.utcnow() - timedelta(minutes=ONLINE_THRESHOLD_MINUTES)
+
+        # Missing or null last_seen sorts below any date, so those users come out offline
+        debug_info = await users_collection.aggregate([
+            {"$project": {
+                "_id": 0,
+                "id": {"$toString": "$_id"},
+                "name": 1,
+                "last_seen": {"$ifNull": ["$last_seen", None]},
+                "is_active": {"$ifNull": ["$is_active", True]},
+                "is_online": {"$gt": ["$last_seen", threshold]}
+            }}
+        ]).to_list(None)
+
+        return ORJSONResponse({
             "threshold": threshold,
             "current_time": datetime.utcnow(),
             "users": debug_info
-        }
+        })
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -1,18 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
 from bson import ObjectId
+import time
 import uuid
 
 from app.auth import get_current_active_user, TokenData
 from app.database import get_collection
 from app.models.doodle import (
     CreateDoodleRequest, RespondToDoodleRequest, CloseDoodleRequest,
-    DoodleResponse, DoodleListItem, DoodlePoll, DoodleStatus, UserResponse
+    DoodleResponse, DoodleListItem, DoodlePoll, DoodleStatus, UserResponse, DoodleStatsResponse,
+    DOODLE_LIST_ADAPTER
 )
+from app.utils.responses import adapter_response
 
 router = APIRouter()
 
+DOODLE_STATS_CACHE_TTL_SECONDS = 30
+DOODLE_STATS_CACHE_MAX_SIZE = 256
+
+# doodle_id -> (computed_at, stats); dropped when a doodle's responses change
+_doodle_stats_cache: Dict[str, Tuple[float, dict]] = {}
+
+def invalidate_doodle_stats(doodle_id: str):
+    """Forget cached statistics for a doodle"""
+    _doodle_stats_cache.pop(doodle_id, None)
+
+def calculate_option_stats(options, responses):
+    """Count yes/no/maybe votes per option in a single pass over the responses"""
+    option_stats = {option["option_id"]: {"yes": 0, "no": 0, "maybe": 0} for option in options}
+
+    for response in responses:
+        for option_id, vote in response.get("responses", {}).items():
+            counts = option_stats.get(option_id)
+            if counts is not None:
+                counts[vote] = counts.get(vote, 0) + 1
+
+    return option_stats
+
 @router.options("/doodles")
 async def doodles_options():
     """Handle OPTIONS request for CORS preflight"""
@@ -41,7 +66,7 @@ async def create_doodle(
         doodle_doc = {
             "title": doodle_data.title,
             "description": doodle_data.description,
-            "creator_id": ObjectId(current_user.user_id),
+            "creator_id": current_user.user_oid,
             "creator_name": current_user.name,
             "options": [option.dict() for option in doodle_data.options],
             "responses": [],
@@ -107,7 +132,7 @@ async def get_doodles(
             query["status"] = status_filter
 
         if created_by_me:
-            query["creator_id"] = ObjectId(current_user.user_id)
+            query["creator_id"] = current_user.user_oid
 
         # Update expired doodles
         await collection.update_many(
@@ -134,23 +159,22 @@ async def get_doodles(
                 for response in doodle.get("responses", [])
             )
 
-            doodle_item = DoodleListItem(
-                id=str(doodle["_id"]),
-                title=doodle["title"],
-                description=doodle.get("description"),
-                creator_id=str(doodle["creator_id"]),
-                creator_name=doodle["creator_name"],
-                status=doodle["status"],
-                total_options=len(doodle.get("options", [])),
-                total_responses=len(doodle.get("responses", [])),
-                deadline=doodle.get("settings", {}).get("deadline"),
-                created_at=doodle["created_at"],
-                is_participant=user_has_responded
-            )
-            response_doodles.append(doodle_item)
+            response_doodles.append({
+                "id": str(doodle["_id"]),
+                "title": doodle["title"],
+                "description": doodle.get("description"),
+                "creator_id": str(doodle["creator_id"]),
+                "creator_name": doodle["creator_name"],
+                "status": doodle["status"],
+                "total_options": len(doodle.get("options", [])),
+                "total_responses": len(doodle.get("responses", [])),
+                "deadline": doodle.get("settings", {}).get("deadline"),
+                "created_at": doodle["created_at"],
+                "is_participant": user_has_responded
+            })
 
         print(f"Returning {len(response_doodles)} doodles")
-        return response_doodles
+        return adapter_response(DOODLE_LIST_ADAPTER, response_doodles)
 
     except Exception as e:
         print(f"Error getting doodles: {e}")
@@ -185,15 +209,7 @@ async def get_doodle(
             )
 
         # Calculate statistics
-        option_stats = {}
-        for option in doodle.get("options", []):
-            option_id = option["option_id"]
-            option_stats[option_id] = {"yes": 0, "no": 0, "maybe": 0}
-
-        for response in doodle.get("responses", []):
-            for option_id, vote in response.get("responses", {}).items():
-                if option_id in option_stats:
-                    option_stats[option_id][vote] = option_stats[option_id].get(vote, 0) + 1
+        option_stats = calculate_option_stats(doodle.get("options", []), doodle.get("responses", []))
 
         # Convert to response format
         response_data = {
@@ -217,7 +233,8 @@ async def get_doodle(
         for response in response_data["responses"]:
             response["user_id"] = str(response["user_id"])
 
-        return DoodleResponse(**response_data)
+        # response_model validates the document once on the way out
+        return response_data
 
     except HTTPException:
         raise
@@ -228,6 +245,64 @@ async def get_doodle(
             detail=f"Failed to get doodle: {str(e)}"
         )
 
+@router.get("/doodles/{doodle_id}/stats", response_model=DoodleStatsResponse)
+async def get_doodle_stats(
+    doodle_id: str,
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """Get vote counts per option, aggregated in MongoDB without loading the responses"""
+    if not ObjectId.is_valid(doodle_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid doodle ID format"
+        )
+
+    cached = _doodle_stats_cache.get(doodle_id)
+    if cached and time.monotonic() - cached[0] < DOODLE_STATS_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    collection = get_collection("doodle_polls")
+    result = await collection.aggregate([
+        {"$match": {"_id": ObjectId(doodle_id)}},
+        {"$facet": {
+            "poll": [{"$project": {
+                "_id": 0,
+                "option_ids": "$options.option_id",
+                "total_responses": {"$size": {"$ifNull": ["$responses", []]}}
+            }}],
+            "votes": [
+                {"$unwind": "$responses"},
+                {"$project": {"votes": {"$objectToArray": "$responses.responses"}}},
+                {"$unwind": "$votes"},
+                {"$group": {"_id": {"option_id": "$votes.k", "vote": "$votes.v"}, "count": {"$sum": 1}}}
+            ]
+        }}
+    ]).to_list(1)
+
+    if not result or not result[0]["poll"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doodle not found"
+        )
+
+    poll = result[0]["poll"][0]
+    option_stats = {option_id: {"yes": 0, "no": 0, "maybe": 0} for option_id in poll.get("option_ids", [])}
+    for group in result[0]["votes"]:
+        counts = option_stats.get(group["_id"]["option_id"])
+        if counts is not None:
+            counts[group["_id"]["vote"]] = group["count"]
+
+    stats = {
+        "doodle_id": doodle_id,
+        "total_responses": poll["total_responses"],
+        "option_stats": option_stats
+    }
+
+    if len(_doodle_stats_cache) >= DOODLE_STATS_CACHE_MAX_SIZE:
+        _doodle_stats_cache.pop(next(iter(_doodle_stats_cache)), None)
+    _doodle_stats_cache[doodle_id] = (time.monotonic(), stats)
+    return stats
+
 @router.options("/doodles/{doodle_id}/respond")
 async def respond_doodle_options(doodle_id: str):
     """Handle OPTIONS request for CORS preflight"""
@@ -280,7 +355,7 @@ async def respond_to_doodle(
 
         # Create user response
         user_response = {
-            "user_id": ObjectId(current_user.user_id),
+            "user_id": current_user.user_oid,
             "username": current_user.name,
             "responses": response_data.responses,
             "comment": response_data.comment,
@@ -291,7 +366,7 @@ async def respond_to_doodle(
         await collection.update_one(
             {"_id": ObjectId(doodle_id)},
             {
-                "$pull": {"responses": {"user_id": ObjectId(current_user.user_id)}},
+                "$pull": {"responses": {"user_id": current_user.user_oid}},
             }
         )
 
@@ -302,6 +377,7 @@ async def respond_to_doodle(
             }
         )
 
+        invalidate_doodle_stats(doodle_id)
         print(f"Response saved for user {current_user.name}")
 
         # Return updated doodle
@@ -424,6 +500,7 @@ async def delete_doodle(
                 detail="Failed to delete doodle"
             )
 
+        invalidate_doodle_stats(doodle_id)
         print(f"Doodle {doodle_id} deleted successfully")
 
         return {
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from bson import ObjectId
-from app.models.category import CategoryModel, CategoryCreate, CategoryUpdate, CategoryResponse
+from app.models.category import CategoryModel, CategoryCreate, CategoryUpdate, CategoryResponse, CATEGORY_LIST_ADAPTER
 from app.database import get_collection
 from app.auth import get_current_admin_user, TokenData
+from app.utils.responses import adapter_response
 from datetime import datetime
 
 router = APIRouter()
@@ -17,9 +18,9 @@ async def get_categories():
     async for category in categories_collection.find({"is_active": True}).sort("name", 1):
         category["id"] = str(category["_id"])
         category["_id"] = str(category["_id"])
-        categories.append(CategoryResponse(**category))
+        categories.append(category)
     
-    return categories
+    return adapter_response(CATEGORY_LIST_ADAPTER, categories)
 
 @router.get("/all", response_model=List[CategoryResponse])
 async def get_all_categories(current_admin: TokenData = Depends(get_current_admin_user)):
@@ -30,9 +31,9 @@ async def get_all_categories(current_admin: TokenData = Depends(get_current_admi
     async for category in categories_collection.find().sort("name", 1):
         category["id"] = str(category["_id"])
         category["_id"] = str(category["_id"])
-        categories.append(CategoryResponse(**category))
+        categories.append(category)
     
-    return categories
+    return adapter_response(CATEGORY_LIST_ADAPTER, categories)
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: str):
@@ -103,7 +104,7 @@ async def update_category(
                 detail="Category name already exists"
             )
     
-    update_data = {k: v for k, v in category_data.model_dump().items() if v is not None}
+    update_data = category_data.model_dump(include=category_data.model_fields_set, exclude_none=True)
     update_data["updated_at"] = datetime.utcnow()
     
     result = await categories_collection.update_one(
@@ -20,7 +20,8 @@ async def get_recent_messages(limit: int = 50):
     async for message in collection.find().sort("created_at", -1).limit(limit):
         # Convert ObjectId to string for the response
         message["_id"] = str(message["_id"])
-        messages.append(ChatMessageResponse(**message))
+        # response_model validates the documents once; building models here would validate twice
+        messages.append(message)
     return list(reversed(messages))
 
 @router.post("/messages", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
@@ -35,4 +36,4 @@ async def create_message(message_data: ChatMessageCreate):
     
     # Convert ObjectId to string for the response
     created_message["_id"] = str(created_message["_id"])
-    return ChatMessageResponse(**created_message)
\ No newline at end of file
+    return created_message
\ No newline at end of file
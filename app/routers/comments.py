@@ -22,37 +22,28 @@ async def get_comments_for_post(post_id: str):
     collection = get_collection("comments")
 
     # Get all comments for the post
-    all_comments = []
-    async for comment in collection.find({"post_id": ObjectId(post_id)}).sort("created_at", 1):
+    all_comments = await collection.find({"post_id": ObjectId(post_id)}).sort("created_at", 1).to_list(None)
+
+    # Index comments by id as plain dicts; response_model validates the finished tree once
+    comments_dict = {}
+    for comment in all_comments:
         # Convert ObjectId to string and map _id to id
         comment["id"] = str(comment["_id"])
-        comment["_id"] = str(comment["_id"])
+        comment["_id"] = comment["id"]
         comment["post_id"] = str(comment["post_id"])
         if comment.get("parent_id"):
             comment["parent_id"] = str(comment["parent_id"])
-        all_comments.append(comment)
+        comment["replies"] = []
+        comments_dict[comment["id"]] = comment
 
-    # Organize comments into nested structure
-    comments_dict = {}
+    # Attach replies to their parents in one pass
     root_comments = []
-
-    # First pass: create all comment objects
     for comment in all_comments:
-        comment_obj = CommentResponse(**comment)
-        comments_dict[comment["id"]] = comment_obj
-
-        # If this is a root comment (no parent), add to root list
-        if not comment.get("parent_id"):
-            root_comments.append(comment_obj)
-
-    # Second pass: attach replies to their parents
-    for comment in all_comments:
-        if comment.get("parent_id"):
-            parent_id = comment["parent_id"]
-            if parent_id in comments_dict:
-                parent_comment = comments_dict[parent_id]
-                reply_comment = comments_dict[comment["id"]]
-                parent_comment.replies.append(reply_comment)
+        parent_id = comment.get("parent_id")
+        if not parent_id:
+            root_comments.append(comment)
+        elif parent_id in comments_dict:
+            comments_dict[parent_id]["replies"].append(comment)
 
     return root_comments
 
@@ -7,9 +7,10 @@ import cloudinary.uploader
 import requests
 import re
 from urllib.parse import urlparse
-from app.models.file import FileModel, FileCreate, FileResponse, URLCreate
+from app.models.file import FileModel, FileCreate, FileResponse, URLCreate, FILE_LIST_ADAPTER
 from app.database import get_collection
 from app.config import settings
+from app.utils.responses import adapter_response
 
 router = APIRouter()
 
@@ -19,6 +20,7 @@ cloudinary.config(
     api_key=settings.cloudinary_api_key,
     api_secret=settings.cloudinary_api_secret
 )
+CLOUDINARY_CONFIGURED = all([settings.cloudinary_cloud_name, settings.cloudinary_api_key, settings.cloudinary_api_secret])
 
 async def populate_file_category_name(file_doc):
     """Helper function to populate category name for files"""
@@ -62,8 +64,8 @@ async def get_all_files(category_id: str = None):
         # Note: Don't automatically change URLs for existing files as they may not exist at the new path
         # Existing files uploaded as 'image' type should keep their original URLs to work
         
-        files.append(FileResponse(**file_doc))
-    return files
+        files.append(file_doc)
+    return adapter_response(FILE_LIST_ADAPTER, files)
 
 @router.post("/upload", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
 async def upload_file(
@@ -74,7 +76,7 @@ async def upload_file(
 ):
     try:
         # Check if Cloudinary is configured
-        if not all([settings.cloudinary_cloud_name, settings.cloudinary_api_key, settings.cloudinary_api_secret]):
+        if not CLOUDINARY_CONFIGURED:
             raise HTTPException(
                 status_code=500, 
                 detail="Cloudinary not configured. Please set CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, and CLOUDINARY_API_SECRET environment variables."
@@ -149,7 +151,8 @@ async def get_file(file_id: str):
     # Populate category name
     file_doc = await populate_file_category_name(file_doc)
     
-    return FileResponse(**file_doc)
+    # response_model validates the document once on the way out
+    return file_doc
 
 @router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_file(file_id: str):
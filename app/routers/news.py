@@ -2,10 +2,12 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from bson import ObjectId
 from datetime import datetime
-from app.models.news import NewsModel, NewsCreate, NewsUpdate, NewsResponse
+from app.models.news import NewsModel, NewsCreate, NewsUpdate, NewsResponse, NEWS_LIST_ADAPTER
 from app.database import get_collection
 from app.auth import get_current_user
 from app.models.user import TokenData, UserRole
+from app.utils.responses import adapter_response
+from app.utils.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
@@ -19,9 +21,9 @@ async def get_all_news():
         # Convert ObjectId to string and map _id to id
         news_doc["id"] = str(news_doc["_id"])
         news_doc["_id"] = str(news_doc["_id"])
-        news_list.append(NewsResponse(**news_doc))
+        news_list.append(news_doc)
 
-    return news_list
+    return adapter_response(NEWS_LIST_ADAPTER, news_list)
 
 @router.get("/{news_id}", response_model=NewsResponse)
 async def get_news_by_id(news_id: str):
@@ -39,10 +41,15 @@ async def get_news_by_id(news_id: str):
     news_doc["id"] = str(news_doc["_id"])
     news_doc["_id"] = str(news_doc["_id"])
 
-    return NewsResponse(**news_doc)
+    # response_model validates the document once on the way out
+    return news_doc
 
-@router.post("/", response_model=NewsResponse, status_code=status.HTTP_201_CREATED)
-async def create_news(news_data: NewsCreate, current_user: TokenData = Depends(get_current_user)):
+@router.post("/", response_model=NewsResponse, status_code=status.HTTP_201_CREATED,
+             openapi_extra=json_body_openapi(NewsCreate))
+async def create_news(
+    news_data: NewsCreate = Depends(json_body(NewsCreate)),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Create a new news article (authenticated users only)"""
 
     print(f"Creating news with data: {news_data}")  # Debug log
@@ -98,7 +105,7 @@ async def update_news(news_id: str, news_update: NewsUpdate, current_user: Token
         )
 
     # Prepare update data (only include non-None values)
-    update_data = {k: v for k, v in news_update.model_dump().items() if v is not None}
+    update_data = news_update.model_dump(include=news_update.model_fields_set, exclude_none=True)
 
     if not update_data:
         raise HTTPException(status_code=400, detail="No valid fields provided for update")
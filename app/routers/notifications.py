@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from app.models.notification import EmailNotificationCreate, EmailNotificationResponse, EmailPreferencesUpdate
-from app.models.user import TokenData, UserRole, EmailPreferences
+from app.models.user import TokenData, UserRole, DEFAULT_EMAIL_PREFERENCES
 from app.auth import get_current_active_user
 from app.database import get_collection
 from app.services.email_service import email_service
@@ -101,7 +101,7 @@ async def update_email_preferences(
         collection = get_collection("users")
         
         # Get current preferences
-        user = await collection.find_one({"_id": ObjectId(current_user.user_id)})
+        user = await collection.find_one({"_id": current_user.user_oid})
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -122,7 +122,7 @@ async def update_email_preferences(
         
         if update_data:
             result = await collection.update_one(
-                {"_id": ObjectId(current_user.user_id)},
+                {"_id": current_user.user_oid},
                 {"$set": update_data}
             )
             
@@ -130,7 +130,7 @@ async def update_email_preferences(
                 raise HTTPException(status_code=404, detail="User not found")
         
         # Get updated user data
-        updated_user = await collection.find_one({"_id": ObjectId(current_user.user_id)})
+        updated_user = await collection.find_one({"_id": current_user.user_oid})
         
         return {
             "success": True,
@@ -196,14 +196,14 @@ async def get_email_preferences(
     
     try:
         collection = get_collection("users")
-        user = await collection.find_one({"_id": ObjectId(current_user.user_id)})
+        user = await collection.find_one({"_id": current_user.user_oid})
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Return preferences with defaults
         preferences = user.get("email_preferences", {})
-        default_prefs = EmailPreferences()
+        default_prefs = DEFAULT_EMAIL_PREFERENCES
         
         return {
             "new_posts": preferences.get("new_posts", default_prefs.new_posts),
@@ -411,17 +411,11 @@ async def get_all_user_preferences(
     try:
         collection = get_collection("users")
         users = []
+        # Defaults for preferences that don't exist
+        default_prefs = DEFAULT_EMAIL_PREFERENCES.model_dump()
         
         async for user in collection.find({"is_active": True}).sort("name", 1):
             preferences = user.get("email_preferences", {})
-            # Set defaults if preferences don't exist
-            default_prefs = {
-                "new_posts": True,
-                "admin_notifications": True,
-                "comment_replies": True,
-                "new_comments": True,
-                "weekly_digest": False
-            }
             
             for key, default_value in default_prefs.items():
                 if key not in preferences:
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Request
 from typing import List
 from bson import ObjectId
-from app.models.post import PostModel, PostCreate, PostUpdate, PostResponse, PostPublish, PostPinPriority
+from app.models.post import PostModel, PostCreate, PostUpdate, PostResponse, PostPublish, PostPinPriority, POST_LIST_ADAPTER
 from app.models.user import TokenData
 from app.database import get_collection
 from app.auth import get_current_active_user, get_current_admin_user
 from app.services.email_service import email_service
 from app.services.activity_logger import ActivityLogger
+from app.utils.responses import adapter_response
+from app.utils.request_body import json_body, json_body_openapi
 from datetime import datetime
 
 router = APIRouter()
@@ -57,8 +59,8 @@ async def get_all_posts(category_id: str = None):
         # Populate comments count
         post = await populate_comments_count(post)
 
-        posts.append(PostResponse(**post))
-    return posts
+        posts.append(post)
+    return adapter_response(POST_LIST_ADAPTER, posts)
 
 @router.get("/all", response_model=List[PostResponse])
 async def get_all_posts_including_drafts(
@@ -101,8 +103,8 @@ async def get_all_posts_including_drafts(
         # Populate comments count
         post = await populate_comments_count(post)
 
-        posts.append(PostResponse(**post))
-    return posts
+        posts.append(post)
+    return adapter_response(POST_LIST_ADAPTER, posts)
 
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
@@ -147,12 +149,14 @@ async def get_post(
             # Don't fail the request if logging fails
             print(f"Error logging post view: {e}")
 
-    return PostResponse(**post)
+    # response_model validates the document once on the way out
+    return post
 
-@router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED,
+             openapi_extra=json_body_openapi(PostCreate))
 async def create_post(
-    post_data: PostCreate,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    post_data: PostCreate = Depends(json_body(PostCreate))
 ):
     collection = get_collection("posts")
     
@@ -203,7 +207,7 @@ async def update_post(post_id: str, post_data: PostUpdate):
     
     collection = get_collection("posts")
     
-    update_data = {k: v for k, v in post_data.model_dump().items() if v is not None}
+    update_data = post_data.model_dump(include=post_data.model_fields_set, exclude_none=True)
     
     # Validate category_id if provided
     if "category_id" in update_data and update_data["category_id"]:
@@ -308,8 +312,8 @@ async def get_my_drafts(current_user: TokenData = Depends(get_current_active_use
         # Populate comments count
         post = await populate_comments_count(post)
 
-        posts.append(PostResponse(**post))
-    return posts
+        posts.append(post)
+    return adapter_response(POST_LIST_ADAPTER, posts)
 
 @router.put("/{post_id}/publish", response_model=PostResponse)
 async def publish_post(
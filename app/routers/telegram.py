@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Dict, Any
 from pydantic import BaseModel
-from bson import ObjectId
 from datetime import datetime
 
 from app.models.user import UserModel, TelegramPreferences, TokenData
 from app.database import get_collection
 from app.auth import get_current_active_user, get_current_admin_user
 from app.services.telegram_service import telegram_service
+from app.utils.telegram_admins import invalidate_admin_telegram_ids
 
 router = APIRouter(prefix="/telegram", tags=["telegram"])
 
@@ -41,7 +41,7 @@ async def configure_telegram(
         }
 
         result = await users_collection.update_one(
-            {"_id": ObjectId(current_user.user_id)},
+            {"_id": current_user.user_oid},
             {"$set": update_data}
         )
 
@@ -51,6 +51,8 @@ async def configure_telegram(
                 detail="Usuario no encontrado"
             )
 
+        invalidate_admin_telegram_ids()
+
         return {
             "success": True,
             "message": "Configuración de Telegram actualizada exitosamente"
@@ -67,7 +69,7 @@ async def get_telegram_config(current_user: TokenData = Depends(get_current_acti
     """Get user's current Telegram configuration"""
     try:
         users_collection = get_collection("users")
-        user = await users_collection.find_one({"_id": ObjectId(current_user.user_id)})
+        user = await users_collection.find_one({"_id": current_user.user_oid})
 
         if not user:
             raise HTTPException(
@@ -100,7 +102,7 @@ async def test_telegram_notification(
     """Test Telegram notification"""
     try:
         users_collection = get_collection("users")
-        user = await users_collection.find_one({"_id": ObjectId(current_user.user_id)})
+        user = await users_collection.find_one({"_id": current_user.user_oid})
 
         if not user or not user.get("telegram_id"):
             raise HTTPException(
@@ -96,7 +96,7 @@ async def create_video_call(
 
         call_doc = {
             "channel_name": channel_name,
-            "creator_id": ObjectId(current_user.user_id),
+            "creator_id": current_user.user_oid,
             "creator_name": current_user.name,
             "call_type": call_data.call_type,
             "invited_users": [ObjectId(uid) for uid in call_data.invited_users],
@@ -146,9 +146,9 @@ async def get_my_calls(
 
     calls = await collection.find({
         "$or": [
-            {"creator_id": ObjectId(current_user.user_id)},
-            {"invited_users": ObjectId(current_user.user_id)},
-            {"participants.user_id": ObjectId(current_user.user_id)}
+            {"creator_id": current_user.user_oid},
+            {"invited_users": current_user.user_oid},
+            {"participants.user_id": current_user.user_oid}
         ]
     }).sort("created_at", -1).to_list(length=100)
 
@@ -178,7 +178,7 @@ async def join_video_call(
         raise HTTPException(status_code=404, detail="Call not found")
 
     # Check if user is invited or it's an open meeting room
-    user_id = ObjectId(current_user.user_id)
+    user_id = current_user.user_oid
     if (call["call_type"] == "private" and
         user_id not in call["invited_users"] and
         call["creator_id"] != user_id):
@@ -223,7 +223,7 @@ async def leave_video_call(
     except:
         raise HTTPException(status_code=400, detail="Invalid call ID")
 
-    user_id = ObjectId(current_user.user_id)
+    user_id = current_user.user_oid
 
     # Remove participant
     await collection.update_one(
@@ -350,7 +350,7 @@ async def create_meeting_room(
 
         room_doc = {
             "channel_name": channel_name,
-            "creator_id": ObjectId(current_user.user_id),
+            "creator_id": current_user.user_oid,
             "creator_name": current_user.name,
             "call_type": "meeting",
             "room_name": room_data.room_name,
@@ -407,8 +407,8 @@ async def get_call_history(
 
     calls = await collection.find({
         "$or": [
-            {"creator_id": ObjectId(current_user.user_id)},
-            {"participants.user_id": ObjectId(current_user.user_id)}
+            {"creator_id": current_user.user_oid},
+            {"participants.user_id": current_user.user_oid}
         ],
         "status": "ended"
     }).sort("ended_at", -1).limit(limit).to_list(length=limit)
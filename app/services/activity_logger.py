@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import Request
 from app.database import get_collection
 from app.models.user_activity_log import ActivityEventType, UserActivityLogCreate
@@ -8,6 +9,66 @@ import logging
 # Configure Python logging for backup/debugging
 logger = logging.getLogger(__name__)
 
+ACTIVITY_LOG_BATCH_SIZE = 100
+ACTIVITY_LOG_FLUSH_SECONDS = 0.1
+
+# Log documents waiting for the background writer started by start_activity_log_writer
+_log_queue: asyncio.Queue = asyncio.Queue()
+_writer_task: Optional[asyncio.Task] = None
+
+async def _insert_logs(batch: List[Dict[str, Any]]):
+    """Insert a batch of log documents; failures are logged, never raised"""
+    try:
+        collection = get_collection("user_activity_logs")
+        await collection.insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to write {len(batch)} activity logs: {e}")
+
+def _drain_logs(limit: int) -> List[Dict[str, Any]]:
+    """Take up to limit queued log documents without waiting"""
+    batch = []
+    while len(batch) < limit and not _log_queue.empty():
+        batch.append(_log_queue.get_nowait())
+    return batch
+
+async def _activity_log_writer():
+    """Write queued activity logs, coalescing a burst into one insert_many"""
+    batch = []
+    try:
+        while True:
+            batch = [await _log_queue.get()]
+            # Let the rest of a burst arrive (unless a full batch is already waiting),
+            # then write it in one round-trip
+            if _log_queue.qsize() < ACTIVITY_LOG_BATCH_SIZE - 1:
+                await asyncio.sleep(ACTIVITY_LOG_FLUSH_SECONDS)
+            batch.extend(_drain_logs(ACTIVITY_LOG_BATCH_SIZE - 1))
+            await _insert_logs(batch)
+            batch = []
+    except asyncio.CancelledError:
+        # insert_many assigns _id in place, so a batch interrupted mid-write is not duplicated
+        if batch:
+            await _insert_logs(batch)
+        raise
+
+def start_activity_log_writer():
+    """Start the background activity log writer"""
+    global _writer_task
+    if _writer_task is None or _writer_task.done():
+        _writer_task = asyncio.create_task(_activity_log_writer())
+
+async def stop_activity_log_writer():
+    """Stop the background writer and flush any logs still queued"""
+    global _writer_task
+    if _writer_task:
+        _writer_task.cancel()
+        try:
+            await _writer_task
+        except asyncio.CancelledError:
+            pass
+        _writer_task = None
+    while not _log_queue.empty():
+        await _insert_logs(_drain_logs(ACTIVITY_LOG_BATCH_SIZE))
+
 class ActivityLogger:
     """Service for logging user activity events to MongoDB"""
 
@@ -29,6 +90,56 @@ class ActivityLogger:
             logger.warning(f"Error extracting client info: {e}")
             return None, None
 
+    @staticmethod
+    def build_log_document(
+        username: str,
+        event_type: ActivityEventType,
+        success: bool = True,
+        request: Optional[Request] = None,
+        additional_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Validate an activity event and build the document stored in MongoDB"""
+        # Extract client information if request is provided
+        ip_address, user_agent = None, None
+        if request:
+            ip_address, user_agent = ActivityLogger.extract_client_info(request)
+
+        log_entry = UserActivityLogCreate(
+            username=username,
+            event_type=event_type,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            success=success,
+            additional_info=additional_info
+        )
+        log_dict = log_entry.model_dump()
+        log_dict["timestamp"] = datetime.utcnow()
+        return log_dict
+
+    @staticmethod
+    def queue_activity(
+        username: str,
+        event_type: ActivityEventType,
+        success: bool = True,
+        request: Optional[Request] = None,
+        additional_info: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue a user activity event for the background writer instead of
+        waiting on the insert in the request path
+
+        Returns:
+            bool: True if the event was queued, False if it was invalid
+        """
+        try:
+            _log_queue.put_nowait(
+                ActivityLogger.build_log_document(username, event_type, success, request, additional_info)
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue user activity: {username} - {event_type.value} - Error: {e}")
+            return False
+
     @staticmethod
     async def log_activity(
         username: str,
@@ -40,6 +151,9 @@ class ActivityLogger:
         """
         Log user activity event to MongoDB
 
+        The document is queued for the background writer, which batches
+        inserts, so the caller never waits on a database round-trip.
+
         Args:
             username: Username of the user
             event_type: Type of activity event
@@ -48,36 +162,11 @@ class ActivityLogger:
             additional_info: Additional information to log
 
         Returns:
-            bool: True if logged successfully, False otherwise
+            bool: True if queued successfully, False otherwise
         """
-        try:
-            print(f"ActivityLogger.log_activity called: {username} - {event_type.value}")
-            # Extract client information if request is provided
-            ip_address, user_agent = None, None
-            if request:
-                ip_address, user_agent = ActivityLogger.extract_client_info(request)
-            print(f"Client info extracted: IP={ip_address}, UA={user_agent}")
-
-            # Create log entry
-            log_entry = UserActivityLogCreate(
-                username=username,
-                event_type=event_type,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                success=success,
-                additional_info=additional_info
-            )
-            print(f"Log entry created: {log_entry}")
-
-            # Save to MongoDB
-            collection = get_collection("user_activity_logs")
-            log_dict = log_entry.model_dump()
-            log_dict["timestamp"] = datetime.utcnow()
-            print(f"Inserting into MongoDB: {log_dict}")
-
-            result = await collection.insert_one(log_dict)
-            print(f"MongoDB insert result: {result.inserted_id}")
+        queued = ActivityLogger.queue_activity(username, event_type, success, request, additional_info)
 
+        if queued:
             # Also log to Python logger for backup/debugging
             log_level = logging.INFO if success else logging.WARNING
             logger.log(
@@ -85,12 +174,7 @@ class ActivityLogger:
                 f"User activity: {username} - {event_type.value} - {'SUCCESS' if success else 'FAILED'}"
             )
 
-            return True
-
-        except Exception as e:
-            # Log error but don't fail the main operation
-            logger.error(f"Failed to log user activity: {username} - {event_type.value} - Error: {e}")
-            return False
+        return queued
 
     @staticmethod
     async def log_login(username: str, success: bool, request: Optional[Request] = None) -> bool:
@@ -107,7 +191,7 @@ class ActivityLogger:
     @staticmethod
     async def log_logout(username: str, request: Optional[Request] = None) -> bool:
         """Log user logout"""
-        print(f"ActivityLogger.log_logout called for username: {username}")
+        logger.debug("ActivityLogger.log_logout called for username: %s", username)
         additional_info = {"logout_method": "web_interface"}
         result = await ActivityLogger.log_activity(
             username=username,
@@ -116,7 +200,7 @@ class ActivityLogger:
             request=request,
             additional_info=additional_info
         )
-        print(f"ActivityLogger.log_logout result: {result}")
+        logger.debug("ActivityLogger.log_logout result: %s", result)
         return result
 
     @staticmethod
@@ -1,4 +1,6 @@
 import os
+import asyncio
+import threading
 import requests
 import logging
 from typing import Dict, Any, Optional, List
@@ -14,12 +16,23 @@ class TelegramService:
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "")
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
         self.enabled = bool(self.bot_token)
+        # requests.Session isn't thread-safe, so each to_thread worker keeps its own
+        # keep-alive session to the Bot API
+        self._local = threading.local()
 
         if not self.enabled:
             logger.warning("Telegram service disabled - BOT_TOKEN not configured")
         else:
             logger.info("Telegram service initialized successfully")
 
+    @property
+    def session(self) -> requests.Session:
+        """The calling worker thread's requests.Session, created on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
     async def send_message(
         self,
         chat_id: str,
@@ -54,7 +67,8 @@ class TelegramService:
                 "disable_web_page_preview": disable_web_page_preview
             }
 
-            response = requests.post(url, json=payload, timeout=10)
+            # requests is blocking, so run it in a worker thread
+            response = await asyncio.to_thread(lambda: self.session.post(url, json=payload, timeout=10))
 
             if response.status_code == 200:
                 result = response.json()
@@ -85,6 +99,16 @@ class TelegramService:
                 "error": f"Exception: {str(e)}"
             }
 
+    async def _send_to_admins(self, admin_telegram_ids: List[str], message: str) -> List[Dict[str, Any]]:
+        """Send the same message to several admins concurrently"""
+        results = await asyncio.gather(
+            *(self.send_message(admin_id, message) for admin_id in admin_telegram_ids)
+        )
+        return [
+            {"admin_id": admin_id, **result}
+            for admin_id, result in zip(admin_telegram_ids, results)
+        ]
+
     async def send_login_notification(self, user_name: str, user_telegram_id: str) -> Dict[str, Any]:
         """Send login notification to user's Telegram"""
         timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
@@ -171,15 +195,7 @@ class TelegramService:
 ℹ️ <i>Monitoreo de accesos para administradores</i>
         """.strip()
 
-        results = []
-        for admin_id in admin_telegram_ids:
-            result = await self.send_message(admin_id, formatted_message)
-            results.append({
-                "admin_id": admin_id,
-                **result
-            })
-
-        return results
+        return await self._send_to_admins(admin_telegram_ids, formatted_message)
 
     async def send_admin_chat_notification(
         self,
@@ -202,15 +218,7 @@ class TelegramService:
 🌐 <i>Monitoreo de chat para administradores</i>
         """.strip()
 
-        results = []
-        for admin_id in admin_telegram_ids:
-            result = await self.send_message(admin_id, formatted_message)
-            results.append({
-                "admin_id": admin_id,
-                **result
-            })
-
-        return results
+        return await self._send_to_admins(admin_telegram_ids, formatted_message)
 
     async def send_admin_notification(
         self,
@@ -228,15 +236,7 @@ class TelegramService:
 🤖 <i>Enviado desde Yskandar Community</i>
         """.strip()
 
-        results = []
-        for admin_id in admin_telegram_ids:
-            result = await self.send_message(admin_id, formatted_message)
-            results.append({
-                "admin_id": admin_id,
-                **result
-            })
-
-        return results
+        return await self._send_to_admins(admin_telegram_ids, formatted_message)
 
     async def get_bot_info(self) -> Dict[str, Any]:
         """Get bot information for verification"""
@@ -248,7 +248,7 @@ class TelegramService:
 
         try:
             url = f"{self.base_url}/getMe"
-            response = requests.get(url, timeout=10)
+            response = await asyncio.to_thread(lambda: self.session.get(url, timeout=10))
 
             if response.status_code == 200:
                 result = response.json()
@@ -1,10 +1,66 @@
+import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.database import get_collection
 from bson import ObjectId
+from pymongo import UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
 
 ONLINE_THRESHOLD_MINUTES = 5  # Users are considered offline after 5 minutes of inactivity
 
+# Heartbeat last_seen values are held here and written together by the background flusher
+LAST_SEEN_FLUSH_SECONDS = 5
+_pending_last_seen: Dict[ObjectId, datetime] = {}
+_flusher_task: Optional[asyncio.Task] = None
+
+def record_last_seen(user_oid: ObjectId, timestamp: datetime):
+    """Queue a last_seen update; a later heartbeat from the same user replaces it"""
+    _pending_last_seen[user_oid] = timestamp
+
+async def flush_last_seen():
+    """Write all pending last_seen values in one unordered bulk_write"""
+    if not _pending_last_seen:
+        return
+    ops = [
+        UpdateOne({"_id": user_oid}, {"$set": {"last_seen": timestamp}})
+        for user_oid, timestamp in _pending_last_seen.items()
+    ]
+    _pending_last_seen.clear()
+    try:
+        result = await get_collection("users").bulk_write(ops, ordered=False)
+        logger.debug(
+            "Flushed %d last_seen updates - matched: %s, modified: %s",
+            len(ops), result.matched_count, result.modified_count
+        )
+    except Exception as e:
+        logger.error("Failed to flush %d last_seen updates: %s", len(ops), e)
+
+async def _last_seen_flusher():
+    """Flush pending last_seen values every LAST_SEEN_FLUSH_SECONDS"""
+    while True:
+        await asyncio.sleep(LAST_SEEN_FLUSH_SECONDS)
+        await flush_last_seen()
+
+def start_last_seen_flusher():
+    """Start the background last_seen flusher"""
+    global _flusher_task
+    if _flusher_task is None or _flusher_task.done():
+        _flusher_task = asyncio.create_task(_last_seen_flusher())
+
+async def stop_last_seen_flusher():
+    """Stop the background flusher and write the last window of updates"""
+    global _flusher_task
+    if _flusher_task:
+        _flusher_task.cancel()
+        try:
+            await _flusher_task
+        except asyncio.CancelledError:
+            pass
+        _flusher_task = None
+    await flush_last_seen()
+
 def is_user_online(last_seen: datetime | None) -> bool:
     """
     Determine if a user is online based on their last_seen timestamp.
@@ -23,18 +79,14 @@ async def get_online_users() -> List[Dict[str, Any]]:
     users_collection = get_collection("users")
     threshold = datetime.utcnow() - timedelta(minutes=ONLINE_THRESHOLD_MINUTES)
 
-    print(f"Getting online users with threshold: {threshold}")  # Debug log
-
-    # First, let's see all users with last_seen field
-    all_users_with_last_seen = []
-    async for user in users_collection.find({"last_seen": {"$exists": True}}):
-        all_users_with_last_seen.append({
-            "name": user.get("name"),
-            "last_seen": user.get("last_seen"),
-            "is_active": user.get("is_active")
-        })
-
-    print(f"All users with last_seen field: {all_users_with_last_seen}")  # Debug log
+    # The full last_seen dump costs an extra query, so only run it when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Getting online users with threshold: %s", threshold)
+        all_users_with_last_seen = await users_collection.find(
+            {"last_seen": {"$exists": True}},
+            {"_id": 0, "name": 1, "last_seen": 1, "is_active": 1}
+        ).to_list(None)
+        logger.debug("All users with last_seen field: %s", all_users_with_last_seen)
 
     online_users = []
     async for user in users_collection.find({
@@ -48,9 +100,9 @@ async def get_online_users() -> List[Dict[str, Any]]:
             "avatar": user.get("avatar"),
             "last_seen": user.get("last_seen")
         })
-        print(f"Found online user: {user.get('name')} - last_seen: {user.get('last_seen')}")  # Debug log
+        logger.debug("Found online user: %s - last_seen: %s", user.get('name'), user.get('last_seen'))
 
-    print(f"Total online users found: {len(online_users)}")  # Debug log
+    logger.debug("Total online users found: %d", len(online_users))
     return online_users
 
 async def cleanup_offline_users() -> int:
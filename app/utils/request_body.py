@@ -0,0 +1,28 @@
+from typing import Any, Dict, Type
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+def json_body(model: Type[BaseModel]):
+    """
+    Dependency that validates the raw request body with model.model_validate_json.
+    Parses and validates in one pydantic-core pass instead of json.loads followed by
+    model validation. Errors are reported like FastAPI's own body validation errors.
+    """
+    async def dependency(request: Request):
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+    return dependency
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documenting the request body read by json_body"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
@@ -0,0 +1,33 @@
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+def orjson_default(value: Any):
+    """Encode types orjson doesn't handle natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    Handles datetimes natively and ObjectIds via the default callback.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+def adapter_response(adapter: TypeAdapter, content: Any) -> Response:
+    """
+    Validate and serialize content with a prebuilt TypeAdapter in one pass.
+    Returning a Response makes FastAPI skip its own response_model validation,
+    which is kept on the route only for the OpenAPI schema.
+    """
+    return Response(
+        adapter.dump_json(adapter.validate_python(content), by_alias=True),
+        media_type="application/json"
+    )
@@ -0,0 +1,13 @@
+"""
+orjson-backed replacement for the json module used by python-socketio.
+Passed to socketio.AsyncServer(json=...), which calls dumps/loads like the stdlib.
+"""
+import orjson
+from app.utils.responses import orjson_default
+
+def dumps(obj, *args, **kwargs) -> str:
+    # orjson output is always compact, so stdlib options such as separators don't apply
+    return orjson.dumps(obj, default=orjson_default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def loads(s, *args, **kwargs):
+    return orjson.loads(s)
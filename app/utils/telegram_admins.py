@@ -0,0 +1,123 @@
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TELEGRAM_CACHE_TTL_SECONDS = 300  # Admin set and Telegram settings change rarely
+
+# Admin users that opted in to Telegram admin notifications
+ADMIN_TELEGRAM_QUERY = {
+    "role": "admin",
+    "is_active": True,
+    "telegram_id": {"$exists": True, "$ne": None},
+    "telegram_preferences.enabled": True,
+    "telegram_preferences.admin_notifications": True
+}
+
+# Change stream filter: user inserts/deletes/replaces, and updates touching the
+# fields ADMIN_TELEGRAM_QUERY depends on (heartbeat last_seen updates are ignored)
+ADMIN_CHANGES_PIPELINE = [
+    {"$match": {"$or": [
+        {"operationType": {"$in": ["insert", "delete", "replace"]}},
+        {"updateDescription.updatedFields.role": {"$exists": True}},
+        {"updateDescription.updatedFields.is_active": {"$exists": True}},
+        {"updateDescription.updatedFields.telegram_id": {"$exists": True}},
+        {"updateDescription.updatedFields.telegram_preferences": {"$exists": True}},
+        {"updateDescription.removedFields": {"$in": ["telegram_id", "telegram_preferences"]}}
+    ]}}
+]
+CHANGE_STREAM_RETRY_SECONDS = 30
+# Server error code for "$changeStream is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED_CODE = 40573
+
+_cached_ids: Optional[List[str]] = None
+_cached_at = 0.0
+_cache_version = 0
+# True while the change stream is keeping the cache current, so the TTL isn't needed
+_watching = False
+
+def invalidate_admin_telegram_ids():
+    """
+    Forget the cached admin Telegram IDs.
+    Call after changing a user's role, status or Telegram settings.
+    """
+    global _cached_ids, _cache_version
+    _cache_version += 1
+    _cached_ids = None
+
+async def get_admin_telegram_ids() -> List[str]:
+    """
+    Get the Telegram IDs of admins who receive admin notifications.
+    Results are cached in-process for a few minutes.
+    """
+    global _cached_ids, _cached_at
+
+    if _cached_ids is not None and (
+            _watching or time.monotonic() - _cached_at < ADMIN_TELEGRAM_CACHE_TTL_SECONDS):
+        return _cached_ids
+
+    version = _cache_version
+    users_collection = get_collection("users")
+    admin_users = await users_collection.find(
+        ADMIN_TELEGRAM_QUERY,
+        {"telegram_id": 1}
+    ).to_list(None)
+    admin_telegram_ids = [admin["telegram_id"] for admin in admin_users]
+
+    # Don't store a result that was invalidated while the query was running
+    if version == _cache_version:
+        _cached_ids = admin_telegram_ids
+        _cached_at = time.monotonic()
+
+    return admin_telegram_ids
+
+async def _watch_admin_changes():
+    """Refresh the admin Telegram IDs whenever a relevant user change happens"""
+    global _watching
+    while True:
+        try:
+            users_collection = get_collection("users")
+            async with users_collection.watch(ADMIN_CHANGES_PIPELINE) as stream:
+                logger.info("Watching users collection for admin Telegram changes")
+                # Changes made before the stream opened could have been missed
+                invalidate_admin_telegram_ids()
+                _watching = True
+                async for _ in stream:
+                    invalidate_admin_telegram_ids()
+                    await get_admin_telegram_ids()
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            if isinstance(e, OperationFailure) and e.code == CHANGE_STREAM_UNSUPPORTED_CODE:
+                # Standalone servers don't support change streams; the TTL cache still applies
+                logger.info("Admin change stream unavailable, relying on cache TTL: %s", e)
+                return
+            # Transient failures (e.g. history lost, cursor killed) reopen the stream
+            logger.warning("Admin change stream interrupted, retrying: %s", e)
+            _watching = False
+            await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
+        finally:
+            _watching = False
+
+_watch_task: Optional[asyncio.Task] = None
+
+def start_admin_watch():
+    """Start the background change stream watcher"""
+    global _watch_task
+    if _watch_task is None or _watch_task.done():
+        _watch_task = asyncio.create_task(_watch_admin_changes())
+
+async def stop_admin_watch():
+    """Stop the background change stream watcher"""
+    global _watch_task
+    if _watch_task:
+        _watch_task.cancel()
+        try:
+            await _watch_task
+        except asyncio.CancelledError:
+            pass
+        _watch_task = None